@@ -0,0 +1,211 @@
+"""
+Demonio de decodificación RS(15,9): vigila una carpeta "spool" y decodifica
+los A2/A3 que van llegando, sin intervención manual.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# =====================================================================
+# Decodificadores (los scripts tienen espacios y tildes en el nombre)
+# =====================================================================
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+def cargar_script(nombre, archivo):
+    spec = importlib.util.spec_from_file_location(nombre, os.path.join(BASE, archivo))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+dec_A2 = cargar_script("decodificacion_A2", "Reed-Solomon-Decodificación A2.py")
+dec_A3 = cargar_script("decodificacion_A3", "Reed-Solomon-Decodificación A3.py")
+
+# =====================================================================
+# Índice persistente de archivos procesados
+# =====================================================================
+
+def hash_archivo(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for trozo in iter(lambda: f.read(1 << 20), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+def escribir_atomico(ruta, contenido):
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(contenido)
+    os.replace(tmp, ruta)
+
+class IndiceProcesados:
+    """
+    path -> {tam, mtime, sha256, salida, error}. Se guarda en JSON (de
+    forma atómica) después de cada archivo terminado, así al reiniciar el
+    demonio no repite trabajo ya hecho. Los que fallaron también quedan
+    (salida None, error con el motivo) y no se reintentan hasta que
+    cambie su contenido.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        try:
+            with open(ruta) as f:
+                self.entradas = json.load(f)
+        except (OSError, ValueError):
+            self.entradas = {}
+
+    def guardar(self):
+        escribir_atomico(self.ruta, json.dumps(self.entradas, indent=1).encode())
+
+    def necesita_proceso(self, path, st):
+        """
+        True si el archivo es nuevo o cambió su tam/mtime. Acá no se lee el
+        contenido: si el sha256 resulta el mismo lo ve procesar_archivo,
+        que corre en el pool y no frena la revisión de la carpeta.
+        """
+        e = self.entradas.get(path)
+        return e is None or e["tam"] != st.st_size or e["mtime"] != st.st_mtime
+
+    def registrar(self, path, tam, mtime, sha256, salida, error=None):
+        self.entradas[path] = {"tam": tam, "mtime": mtime, "sha256": sha256,
+                               "salida": salida, "error": error}
+        self.guardar()
+
+# =====================================================================
+# Trabajo de cada archivo (corre en el pool)
+# =====================================================================
+
+# Las salidas se llaman <nombre>_A1.txt; con --salida igual a la carpeta
+# vigilada quedan al lado de las entradas y no hay que tomarlas como tales.
+SUFIJO_SALIDA = "_A1.txt"
+
+def procesar_archivo(path, carpeta_salida, usar_cache=True, previo=None):
+    """
+    Decodifica un A2 o A3 (según el nombre) y deja A1 en carpeta_salida.
+    La salida se escribe a un temporal y se renombra: nunca queda un A1
+    a medio escribir. A2 y A3 se tratan igual: si queda alguna palabra
+    irrecuperable (o el archivo es inválido) no se deja salida.
+    previo: entrada del índice para path, si la hay. Si el contenido no
+    cambió (sólo tam/mtime) no se decodifica y se repite su resultado.
+    Devuelve (ruta_salida, sha256_entrada, error); con error, ruta_salida
+    es None.
+    """
+    sha256 = hash_archivo(path)
+    if previo is not None and previo["sha256"] == sha256:
+        return previo["salida"], sha256, previo["error"]
+    nombre = os.path.splitext(os.path.basename(path))[0]
+    salida = os.path.join(carpeta_salida, nombre + SUFIJO_SALIDA)
+    tmp = f"{salida}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        if "A3" in nombre:
+            irrec, _ = dec_A3.decodificar_A3_por_ventanas(path, tmp)
+        else:
+            _, irrec = dec_A2.decodificar_archivo(path, tmp, usar_cache, verbose=False)
+        if irrec:
+            raise ValueError(f"{len(irrec)} palabra(s) irrecuperables (desde la #{irrec[0]})")
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None, sha256, str(e) or type(e).__name__
+
+    os.replace(tmp, salida)
+    return salida, sha256, None
+
+# =====================================================================
+# Bucle principal
+# =====================================================================
+
+def candidatos(carpeta, espera_estable):
+    """
+    A2/A3 (.txt) de la carpeta que no se modificaron en los últimos
+    segundos. Las salidas del propio demonio (*_A1.txt) no cuentan.
+    """
+    ahora = time.time()
+    for entrada in os.scandir(carpeta):
+        if not entrada.is_file() or not entrada.name.lower().endswith(".txt"):
+            continue
+        if entrada.name.endswith(SUFIJO_SALIDA):
+            continue
+        if "A2" not in entrada.name and "A3" not in entrada.name:
+            continue
+        st = entrada.stat()
+        if ahora - st.st_mtime < espera_estable:
+            continue   # todavía se está copiando
+        yield os.path.abspath(entrada.path), st
+
+def demonio(carpeta, carpeta_salida, intervalo=2.0, trabajadores=2, usar_procesos=True,
+            espera_estable=1.0, una_vez=False, usar_cache=True):
+    os.makedirs(carpeta_salida, exist_ok=True)
+    indice = IndiceProcesados(os.path.join(carpeta_salida, "indice.json"))
+
+    Executor = ProcessPoolExecutor if usar_procesos else ThreadPoolExecutor
+    en_curso = {}   # path -> (future, st)
+
+    print(f"Vigilando {carpeta} (salida en {carpeta_salida}). Ctrl+C para terminar.")
+    with Executor(max_workers=trabajadores) as pool:
+        try:
+            while True:
+                for path, st in candidatos(carpeta, espera_estable):
+                    if path in en_curso or not indice.necesita_proceso(path, st):
+                        continue
+                    print(f"→ {os.path.basename(path)}")
+                    previo = indice.entradas.get(path)
+                    en_curso[path] = (pool.submit(procesar_archivo, path, carpeta_salida,
+                                                  usar_cache, previo), st)
+
+                for path, (fut, st) in list(en_curso.items()):
+                    if not fut.done():
+                        continue
+                    del en_curso[path]
+                    try:
+                        salida, sha256, error = fut.result()
+                    except OSError as e:
+                        # no se pudo ni leer (¿lo borraron?): se vuelve a mirar en la próxima revisión
+                        print(f"✗ {os.path.basename(path)}: {e}")
+                        continue
+                    previo = indice.entradas.get(path)
+                    indice.registrar(path, st.st_size, st.st_mtime, sha256, salida, error)
+                    if previo is not None and previo["sha256"] == sha256:
+                        print(f"= {os.path.basename(path)}: mismo contenido, no se decodifica de nuevo")
+                    elif error:
+                        print(f"✗ {os.path.basename(path)}: {error} (no se reintenta hasta que cambie)")
+                    else:
+                        print(f"✓ {os.path.basename(path)} -> {os.path.basename(salida)}")
+
+                if una_vez and not en_curso:
+                    break
+                time.sleep(intervalo if not en_curso else min(intervalo, 0.2))
+        except KeyboardInterrupt:
+            print("\nDeteniendo...")
+
+# =====================================================================
+# MAIN
+# =====================================================================
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Decodifica automáticamente los A2/A3 que llegan a una carpeta.")
+    ap.add_argument("carpeta", nargs="?", default=os.path.join(BASE, "spool"),
+                    help="carpeta a vigilar (por defecto ./spool)")
+    ap.add_argument("--salida", help="carpeta para los A1 y el índice (por defecto <carpeta>/decodificados)")
+    ap.add_argument("--intervalo", type=float, default=2.0, help="segundos entre revisiones")
+    ap.add_argument("--trabajadores", type=int, default=2)
+    ap.add_argument("--hilos", action="store_true", help="usar hilos en vez de procesos")
+    ap.add_argument("--una-vez", action="store_true", help="procesar lo pendiente y salir")
+    ap.add_argument("--sin-cache", action="store_true")
+    args = ap.parse_args()
+
+    carpeta = os.path.abspath(args.carpeta)
+    os.makedirs(carpeta, exist_ok=True)
+    demonio(carpeta, args.salida or os.path.join(carpeta, "decodificados"),
+            intervalo=args.intervalo, trabajadores=args.trabajadores,
+            usar_procesos=not args.hilos, una_vez=args.una_vez,
+            usar_cache=not args.sin_cache)
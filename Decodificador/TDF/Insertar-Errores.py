@@ -63,21 +63,27 @@ def cargar_palabras_rs(ruta, n=15):
     """
     Lee el archivo A2 y lo divide en palabras de n símbolos.
     Soporta formato en 1 línea o múltiples líneas.
+    Con '#largo' en la cabecera la última palabra puede venir acortada.
     """
     with open(ruta, "r") as f:
-        contenido = f.read()
+        lineas = f.read().splitlines()
+
+    # Líneas '#clave=valor' de cabecera (se conservan tal cual)
+    cabecera = [l for l in lineas if l.startswith("#")]
+    contenido = "\n".join(l for l in lineas if not l.startswith("#"))
     
     # Remover espacios, saltos de línea, etc.
     simbolos = "".join(contenido.split())
     
-    # Verificar que sea múltiplo de n
-    if len(simbolos) % n != 0:
+    # Verificar que sea múltiplo de n (salvo última palabra acortada)
+    acortada = any(l.startswith("#largo=") for l in cabecera)
+    if len(simbolos) % n != 0 and not acortada:
         raise ValueError(f"El archivo no es múltiplo de {n} símbolos. Total: {len(simbolos)}")
     
     # Dividir en palabras de n símbolos
     palabras = [simbolos[i:i+n] for i in range(0, len(simbolos), n)]
     
-    return palabras
+    return palabras, cabecera
 
 # ==========================================================
 # MAIN
@@ -93,7 +99,7 @@ if __name__ == "__main__":
         exit()
 
     # Cargar y dividir en palabras de 15 símbolos
-    bloques = cargar_palabras_rs(ruta, n=15)
+    bloques, cabecera = cargar_palabras_rs(ruta, n=15)
 
     print(f"\nA2 cargado OK ({len(bloques)} palabras RS).\n")
     print("Bloques RS (15 símbolos c/u):")
@@ -135,7 +141,7 @@ if __name__ == "__main__":
         palabra = list(bloques[idx])
 
         # Elegir posición (que no tenga error ya)
-        posiciones_disponibles = [p for p in range(15) 
+        posiciones_disponibles = [p for p in range(len(palabra)) 
                                  if p not in errores_por_palabra[idx]]
         
         if not posiciones_disponibles:
@@ -174,6 +180,8 @@ if __name__ == "__main__":
     # Guardar como *_err.txt (en múltiples líneas para mejor legibilidad)
     nuevo_path = ruta.replace(".txt", "_err.txt")
     with open(nuevo_path, "w") as f:
+        for linea in cabecera:
+            f.write(linea + "\n")
         for w in bloques:
             f.write(w + "\n")
 
@@ -0,0 +1,317 @@
+"""
+Codificador Reed-Solomon RS(15,9) GF(16), polinomio x^4 + x + 1.
+A1 -> (compresión opcional) -> A2 (palabras RS) + A3 (entrelazado).
+"""
+
+import os
+import sys
+import heapq
+import zlib
+
+# =====================================================================
+# GF(16) = GF(2)[x] / (x^4 + x + 1)
+# =====================================================================
+
+class GF16:
+    def __init__(self):
+        self.exp = [0]*32
+        self.log = [0]*16
+        self.mul = [[0]*16 for _ in range(16)]
+        self._build()
+
+    def _build(self):
+        self.exp[0] = 1
+        for i in range(1, 15):
+            prev = self.exp[i-1]
+            nxt = (prev << 1) & 0x0F
+            if prev & 0x08:
+                nxt ^= 0x03
+            self.exp[i] = nxt
+
+        self.exp[15] = 1
+        for i in range(16, 32):
+            self.exp[i] = self.exp[i % 15]
+
+        self.log[0] = -1
+        for i in range(15):
+            self.log[self.exp[i]] = i
+
+        for a in range(16):
+            for b in range(16):
+                if a == 0 or b == 0:
+                    self.mul[a][b] = 0
+                else:
+                    self.mul[a][b] = self.exp[(self.log[a] + self.log[b]) % 15]
+
+    def add(self, a, b): return a ^ b
+    def mul2(self, a, b): return self.mul[a][b]
+
+gf16 = GF16()
+
+# =====================================================================
+# Codificación sistemática RS(15,9)
+# =====================================================================
+
+def poly_mul(p, q):
+    r = [0] * (len(p) + len(q) - 1)
+    for i, a in enumerate(p):
+        for j, b in enumerate(q):
+            r[i+j] = gf16.add(r[i+j], gf16.mul2(a, b))
+    return r
+
+class ReedSolomonCodificador:
+    def __init__(self, n=15, k=9):
+        self.n = n
+        self.k = k
+        # g(x) = (x + α^1)(x + α^2)...(x + α^(n-k)), coeficientes de menor a mayor grado
+        self.g = [1]
+        for i in range(1, n - k + 1):
+            self.g = poly_mul(self.g, [gf16.exp[i], 1])
+
+    def codificar_palabra(self, info):
+        """
+        Devuelve la palabra [paridad(n-k) | info(k)]: la info queda en las
+        posiciones n-k..n-1, que es donde la buscan los decodificadores.
+        """
+        r = self.n - self.k
+        resto = [0]*r + list(info)
+        # resto de x^(n-k)·m(x) módulo g(x) (g es mónico)
+        for i in range(self.n - 1, r - 1, -1):
+            coef = resto[i]
+            if coef == 0:
+                continue
+            for j in range(r + 1):
+                resto[i - r + j] = gf16.add(resto[i - r + j], gf16.mul2(self.g[j], coef))
+        return resto[:r] + list(info)
+
+# =====================================================================
+# Compresión Huffman por bloques
+# =====================================================================
+#
+# Cada bloque de A1 (tam_bloque bytes) se comprime por separado y se
+# rellena hasta un múltiplo de 9 bytes (= 2 palabras RS), así cada palabra
+# cae dentro de un único bloque comprimido y una palabra irrecuperable
+# sólo daña ese bloque.
+#
+# El flujo comprimido empieza con una tabla de tamaños: 2 bytes por bloque
+# (tamaño / 9), rellena a múltiplo de 9 bytes. Va codificada con RS como
+# los bloques y el decodificador saca los offsets sumando tamaños. Cada
+# bloque repite su tamaño en la cabecera: si se pierde una entrada de la
+# tabla (o la cabecera de un bloque) el otro dato alcanza para seguir, y
+# cada tamaño se confirma con la cabecera del bloque siguiente.
+#
+# Formato de un bloque:
+#   [tamaño/9 2B][modo 1B][largo 2B][... datos ...][relleno]
+#   modo 0 = guardado sin comprimir
+#   modo 1 = Huffman canónico: [nsim-1 1B][(símbolo, longitud) x nsim][bits]
+
+BLOQUE_ALINEACION = 9
+
+def longitudes_huffman(datos):
+    frec = {}
+    for b in datos:
+        frec[b] = frec.get(b, 0) + 1
+
+    if len(frec) == 1:
+        return {b: 1 for b in frec}
+
+    heap = [(f, i, [s]) for i, (s, f) in enumerate(sorted(frec.items()))]
+    heapq.heapify(heap)
+    largos = {s: 0 for s in frec}
+    cont = len(heap)
+    while len(heap) > 1:
+        f1, _, s1 = heapq.heappop(heap)
+        f2, _, s2 = heapq.heappop(heap)
+        for s in s1 + s2:
+            largos[s] += 1
+        heapq.heappush(heap, (f1 + f2, cont, s1 + s2))
+        cont += 1
+    return largos
+
+def codigos_canonicos(largos):
+    """largos: dict símbolo -> longitud. Devuelve dict símbolo -> (código, longitud)."""
+    codigos = {}
+    codigo = 0
+    largo_prev = 0
+    for s, l in sorted(largos.items(), key=lambda x: (x[1], x[0])):
+        codigo <<= (l - largo_prev)
+        codigos[s] = (codigo, l)
+        codigo += 1
+        largo_prev = l
+    return codigos
+
+def comprimir_bloque(chunk):
+    largos = longitudes_huffman(chunk)
+    codigos = codigos_canonicos(largos)
+
+    tabla = bytearray([len(largos) - 1])
+    for s, l in sorted(largos.items()):
+        tabla += bytes([s, l])
+
+    acum = 0
+    nbits = 0
+    for b in chunk:
+        c, l = codigos[b]
+        acum = (acum << l) | c
+        nbits += l
+    relleno = (-nbits) % 8
+    bits = (acum << relleno).to_bytes((nbits + relleno) // 8, "big")
+
+    cabecera = len(chunk).to_bytes(2, "big")
+    if len(tabla) + len(bits) < len(chunk):
+        bloque = bytes([1]) + cabecera + bytes(tabla) + bits
+    else:
+        bloque = bytes([0]) + cabecera + bytes(chunk)
+
+    bloque += bytes((-(len(bloque) + 2)) % BLOQUE_ALINEACION)
+    return ((len(bloque) + 2) // BLOQUE_ALINEACION).to_bytes(2, "big") + bloque
+
+def comprimir_bloques(datos, tam_bloque=1024):
+    """Lista de bloques comprimidos (cada uno ya alineado a 9 bytes)."""
+    if tam_bloque > 0xFFFF:
+        raise ValueError("tam_bloque debe ser < 65536")
+    return [comprimir_bloque(datos[i:i+tam_bloque]) for i in range(0, len(datos), tam_bloque)]
+
+def tabla_bloques(bloques):
+    tabla = b"".join((len(b) // BLOQUE_ALINEACION).to_bytes(2, "big") for b in bloques)
+    return tabla + bytes((-len(tabla)) % BLOQUE_ALINEACION)
+
+# =====================================================================
+# Nibbles, A2 y A3
+# =====================================================================
+
+def bytes_a_nibbles(data):
+    nibbles = []
+    for b in data:
+        nibbles.append((b >> 4) & 0xF)
+        nibbles.append(b & 0xF)
+    return nibbles
+
+def codificar_nibbles(rs, nibbles):
+    k = rs.k
+    if len(nibbles) % k:
+        nibbles = nibbles + [0] * (k - len(nibbles) % k)
+    return [rs.codificar_palabra(nibbles[i:i+k]) for i in range(0, len(nibbles), k)]
+
+def acortar_ultima(rs, palabras, nibbles):
+    """
+    La última palabra se codifica con la info rellena de ceros, pero sólo
+    se transmiten sus n-k paridades y los nibbles de info reales: los
+    ceros del final los repone el decodificador a partir de '#largo'.
+    """
+    if palabras and nibbles % rs.k:
+        palabras[-1] = palabras[-1][:rs.n - rs.k + nibbles % rs.k]
+    return palabras
+
+def entrelazar_codigos_original(palabras, n=15):
+    """
+    Columna 0 de todas las palabras, luego columna 1, etc. Si la última
+    palabra está acortada, las columnas que no llegan a ella tienen un
+    símbolo menos.
+    """
+    return [w[j] for j in range(n) for w in palabras if j < len(w)]
+
+def calcular_digests(palabras, n_bloque):
+    """CRC32 de cada bloque de n_bloque palabras (símbolos en orden de palabra)."""
+    return [zlib.crc32(bytes(s for w in palabras[i:i+n_bloque] for s in w))
+            for i in range(0, len(palabras), n_bloque)]
+
+def escribir_cabecera(f, meta):
+    for clave, valor in meta.items():
+        f.write(f"#{clave}={valor}\n")
+
+def codificar_archivo(A1_path, A2_path, A3_path, comprimir=False, tam_bloque=1024,
+                      digest_bloque=0):
+    with open(A1_path, "rb") as f:
+        data = f.read()
+
+    meta = {}
+    if comprimir:
+        bloques = comprimir_bloques(data, tam_bloque)
+        meta["comprimido"] = "huffman"
+        meta["bloque"] = tam_bloque
+        meta["largo_original"] = len(data)
+        tabla = tabla_bloques(bloques)
+        print(f"Compresión: {len(data)} -> {len(tabla) + sum(len(b) for b in bloques)} bytes "
+              f"({len(bloques)} bloques)")
+        data = tabla + b"".join(bloques)
+
+    rs = ReedSolomonCodificador(15, 9)
+    palabras = codificar_nibbles(rs, bytes_a_nibbles(data))
+
+    # largo exacto de los bytes codificados: el decodificador corta ahí
+    meta["largo"] = len(data)
+
+    if digest_bloque:
+        # los digests van sobre las palabras completas (con el relleno en 0)
+        meta["digest_bloque"] = digest_bloque
+        meta["digests"] = ",".join(f"{d:08X}" for d in calcular_digests(palabras, digest_bloque))
+
+    palabras = acortar_ultima(rs, palabras, 2 * len(data))
+
+    with open(A2_path, "w") as f:
+        escribir_cabecera(f, meta)
+        for w in palabras:
+            f.write("".join(format(s, "X") for s in w) + "\n")
+
+    with open(A3_path, "w") as f:
+        escribir_cabecera(f, meta)
+        f.write("".join(format(s, "X") for s in entrelazar_codigos_original(palabras)))
+
+    return palabras
+
+def elegir_archivo_txt(carpeta):
+    txts = [f for f in os.listdir(carpeta) if f.lower().endswith(".txt")]
+    txts.sort()
+
+    if not txts:
+        print("No hay archivos .txt en la carpeta:", carpeta)
+        return None
+
+    print("\nArchivos .txt disponibles en:", carpeta)
+    for i, name in enumerate(txts):
+        print(f"  {i+1}) {name}")
+
+    while True:
+        op = input("Elegí un archivo por número (ENTER para cancelar)> ").strip()
+        if op == "":
+            return None
+        if op.isdigit():
+            k = int(op)
+            if 1 <= k <= len(txts):
+                return os.path.join(carpeta, txts[k-1])
+        print("Opción inválida. Probá de nuevo.")
+
+# =====================================================================
+# MAIN
+# =====================================================================
+
+if __name__ == "__main__":
+
+    base = os.path.dirname(os.path.abspath(__file__))
+
+    A1_path = elegir_archivo_txt(base)
+    if A1_path is None:
+        print("Cancelado.")
+        sys.exit(0)
+
+    comprimir = input("¿Comprimir (Huffman por bloques) antes de codificar? (s/n)> ").lower().startswith("s")
+    tam_bloque = 1024
+    if comprimir:
+        op = input(f"Tamaño de bloque en bytes (ENTER = {tam_bloque})> ").strip()
+        if op.isdigit():
+            tam_bloque = int(op)
+
+    digest_bloque = 0
+    if input("¿Agregar digests CRC32 por bloque de palabras? (s/n)> ").lower().startswith("s"):
+        op = input("Palabras por bloque (ENTER = 64)> ").strip()
+        digest_bloque = int(op) if op.isdigit() and int(op) > 0 else 64
+
+    A2_path = os.path.join(base, "A2.txt")
+    A3_path = os.path.join(base, "A3.txt")
+
+    palabras = codificar_archivo(A1_path, A2_path, A3_path, comprimir, tam_bloque,
+                                 digest_bloque)
+    print(f"\n{len(palabras)} palabras RS generadas.")
+    print("Salida guardada en:", A2_path)
+    print("Salida guardada en:", A3_path)
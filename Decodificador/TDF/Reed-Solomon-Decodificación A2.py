@@ -3,6 +3,13 @@ Decodificador Reed-Solomon RS(15,9) GF(16), polinomio x^4 + x + 1.
 """
 
 import os, sys
+import zlib
+import json
+import hashlib
+import time
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
 
 # =====================================================================
 # GF(16) = GF(2)[x] / (x^4 + x + 1)
@@ -56,6 +63,29 @@ class GF16:
 
 gf16 = GF16()
 
+# =====================================================================
+# Palabras y correcciones
+# =====================================================================
+
+class ErroresPalabra:
+    """
+    Correcciones de una palabra. Sólo se crea para palabras con errores;
+    al iterar devuelve (pos, original, magnitud, corregido).
+    """
+    __slots__ = ("pos", "orig", "mags")
+
+    def __init__(self, pos, orig, mags):
+        self.pos = pos
+        self.orig = orig
+        self.mags = mags
+
+    def __len__(self):
+        return len(self.pos)
+
+    def __iter__(self):
+        for p, o, m in zip(self.pos, self.orig, self.mags):
+            yield p, o, m, gf16.add(o, m)
+
 # =====================================================================
 # Polinomios sobre GF(16)
 # =====================================================================
@@ -115,18 +145,50 @@ def poly_derivative(p):
         d.append(p[i] if i % 2 == 1 else 0)
     return trim(d)
 
+def desempaquetar_sindromes(S, cantidad):
+    return [(S >> (4 * i)) & 0xF for i in range(cantidad)]
+
 # =====================================================================
 # Reed-Solomon RS(15,9) por Euclides
 # =====================================================================
 
 class ReedSolomonEuclides:
-    def __init__(self, n=15, k=9):
+    def __init__(self, n=15, k=9, memo=None):
         self.n = n
         self.k = k
         self.t = (n - k) // 2
-
-    def syndromes(self, w):
-        return [poly_eval(w, gf16.exp[i]) for i in range(1, 2*self.t + 1)]
+        self.memo = memo
+
+        # Los síndromes son lineales en los símbolos recibidos:
+        # tabla_sindromes[p][s] = aporte del símbolo s en la posición p a
+        # S1..S(2t), empaquetados de a un nibble (S1 en los 4 bits bajos).
+        self.tabla_sindromes = [
+            [sum(gf16.mul2(s, gf16.exp[(i * p) % 15]) << (4 * (i - 1))
+                 for i in range(1, 2*self.t + 1))
+             for s in range(16)]
+            for p in range(n)
+        ]
+
+        # Λ(x) = (1 + X1·x)(1 + X2·x) -> (Λ1, Λ2) = (X1 + X2, X1·X2):
+        # raices_dos[(Λ1 << 4) | Λ2] = posiciones (p1, p2) de los dos errores
+        self.raices_dos = {}
+        for p1 in range(n):
+            for p2 in range(p1 + 1, n):
+                X1, X2 = gf16.exp[p1], gf16.exp[p2]
+                self.raices_dos[((X1 ^ X2) << 4) | gf16.mul2(X1, X2)] = (p1, p2)
+
+    def syndromes(self, w, empaquetado=False):
+        """
+        Síndromes S1..S(2t) como XOR de n entradas de tabla_sindromes.
+        Con empaquetado=True devuelve el int de 4·2t bits (0 = sin errores),
+        útil como clave de diccionario.
+        """
+        S = 0
+        for fila, s in zip(self.tabla_sindromes, w):
+            S ^= fila[s]
+        if empaquetado:
+            return S
+        return desempaquetar_sindromes(S, 2*self.t)
 
     def euclides(self, S):
         r_prev = [0]*(2*self.t) + [1]
@@ -166,100 +228,894 @@ class ReedSolomonEuclides:
             mags.append(gf16.div2(num, den))
         return mags
 
-    def decodificar_palabra(self, w):
-        S = self.syndromes(w)
+    def errores_pocos(self, S_emp):
+        """
+        Soluciones cerradas para 1 y 2 errores (Peterson). Devuelve
+        (posiciones, magnitudes) sólo si reproducen los 2t síndromes;
+        si no, None y se usa Euclides + Chien + Forney.
+        """
+        S1, S2, S3, S4 = desempaquetar_sindromes(S_emp, 4)
+        mul, div, exp = gf16.mul2, gf16.div2, gf16.exp
+
+        # 1 error: S(i+1) = S(i)·X  ->  X = S2/S1, e = S1/X
+        if S1 and S2:
+            p = gf16.log[div(S2, S1)]
+            e = div(S1, exp[p])
+            if self.tabla_sindromes[p][e] == S_emp:
+                return [p], [e]
+
+        # 2 errores: [S2 S1; S3 S2]·[L1; L2] = [S3; S4]
+        det = mul(S2, S2) ^ mul(S1, S3)
+        if det == 0:
+            return None
+        L1 = div(mul(S3, S2) ^ mul(S1, S4), det)
+        L2 = div(mul(S2, S4) ^ mul(S3, S3), det)
+        par = self.raices_dos.get((L1 << 4) | L2)
+        if par is None:
+            return None
+
+        # magnitudes: [X1 X2; X1² X2²]·[e1; e2] = [S1; S2]
+        p1, p2 = par
+        X1, X2 = exp[p1], exp[p2]
+        d = mul(mul(X1, X2), X1 ^ X2)
+        e1 = div(mul(S1, mul(X2, X2)) ^ mul(S2, X2), d)
+        e2 = div(mul(S1, mul(X1, X1)) ^ mul(S2, X1), d)
+        if e1 and e2 and self.tabla_sindromes[p1][e1] ^ self.tabla_sindromes[p2][e2] == S_emp:
+            return [p1, p2], [e1, e2]
+        return None
+
+    def decodificar_palabra(self, w, validas=None):
+        S_emp = self.syndromes(w, empaquetado=True)
+        if S_emp == 0:
+            return w, w[self.n-self.k:], (), ()
+
+        # Palabras sucias repetidas: el resultado sale del memo
+        clave = None
+        if self.memo is not None and validas is None:
+            clave = self.memo.clave(w)
+            res = self.memo.obtener(clave)
+            if isinstance(res, str):
+                raise ValueError(res)
+            if res is not None:
+                return self.aplicar(w, *desempaquetar_errores(res))
+        try:
+            pos, mags = self.corregir(S_emp, validas)
+        except ValueError as e:
+            if clave is not None:
+                self.memo.guardar(clave, sys.intern(str(e)))
+            raise
+        if clave is not None:
+            self.memo.guardar(clave, empaquetar_errores(pos, mags))
+        return self.aplicar(w, pos, mags)
+
+    def corregir(self, S_emp, validas=None):
+        """Posiciones y magnitudes a partir de los síndromes (empaquetados)."""
+        rapido = self.errores_pocos(S_emp)
+        if rapido is not None:
+            pos, mags = rapido
+        else:
+            S = desempaquetar_sindromes(S_emp, 2*self.t)
+
+            L_raw, O_raw = self.euclides(S)
+            Lambda, Omega = self.normalizar(L_raw, O_raw)
 
-        if all(s == 0 for s in S):
-            return w, w[self.n-self.k:], [], []
+            pos = self.chien(Lambda)
 
-        L_raw, O_raw = self.euclides(S)
-        Lambda, Omega = self.normalizar(L_raw, O_raw)
+            if len(pos) > self.t:
+                raise ValueError("Más de 3 errores — palabra irrecuperable.")
 
-        pos = self.chien(Lambda)
+            mags = self.forney(Omega, Lambda, pos)
 
-        if len(pos) > self.t:
-            raise ValueError("Más de 3 errores — palabra irrecuperable.")
+        # palabra acortada: las posiciones >= validas no se transmitieron (son 0)
+        if validas is not None and any(p >= validas for p in pos):
+            raise ValueError("Error en posición no transmitida — palabra irrecuperable.")
 
-        mags = self.forney(Omega, Lambda, pos)
+        return pos, mags
 
-        w_corr = w[:]
-        errores = []
+    def aplicar(self, w, pos, mags):
+        """Corrige w con los errores (pos, mags): (w_corr, info, pos, errores)."""
+        w_corr = bytearray(w)
+        errores = ErroresPalabra(pos, [w_corr[p] for p in pos], mags)
         for p, m in zip(pos, mags):
-            orig = w_corr[p]
-            corr = gf16.add(orig, m)
-            errores.append((p, orig, m, corr))
-            w_corr[p] = corr
+            w_corr[p] = gf16.add(w_corr[p], m)
 
-        return w_corr, w_corr[self.n-self.k:], pos, errores
+        w_corr = bytes(w_corr)
+        return w_corr, w_corr[self.n-self.k:], tuple(pos), errores
 
 # =====================================================================
-# Lectura A2 en 1 línea o varias
+# Memo de palabras sucias repetidas
 # =====================================================================
 
-def asciihex_to_symbol(b):
-    if 48 <= b <= 57: return b - 48
-    if 65 <= b <= 70: return b - 55
-    raise ValueError("Símbolos hex inválidos.")
+MEMO_MAX_PALABRAS = 1 << 15
+
+def empaquetar_errores(pos, mags):
+    """Errores de una palabra en un int: un 1 inicial y un byte (pos << 4 | magnitud) por error."""
+    v = 1
+    for p, m in zip(reversed(pos), reversed(mags)):
+        v = v << 8 | p << 4 | m
+    return v
+
+def desempaquetar_errores(v):
+    pos, mags = [], []
+    while v > 1:
+        pos.append(v >> 4 & 0xF)
+        mags.append(v & 0xF)
+        v >>= 8
+    return pos, mags
+
+class MemoPalabras:
+    """
+    LRU acotado: palabra recibida (15 nibbles empaquetados en un int de
+    60 bits) -> sus errores (empaquetar_errores), o el mensaje de error si
+    fue irrecuperable; la palabra corregida se rearma en cada acierto.
+    Texto codificado y zonas de relleno repiten muchas palabras
+    idénticas; cada copia se corrige una sola vez.
+    Lleva lock porque lo comparten los hilos trabajadores (con procesos
+    cada trabajador tiene el suyo).
+    """
+    def __init__(self, tam_max=MEMO_MAX_PALABRAS):
+        self.tam_max = tam_max
+        self.entradas = OrderedDict()
+        self.lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(w):
+        return int(bytes(w).translate(SIMBOLO_A_HEX), 16)
+
+    def obtener(self, clave):
+        with self.lock:
+            res = self.entradas.get(clave)
+            if res is None:
+                self.fallos += 1
+            else:
+                self.entradas.move_to_end(clave)
+                self.aciertos += 1
+            return res
+
+    def guardar(self, clave, res):
+        with self.lock:
+            self.entradas[clave] = res
+            self.entradas.move_to_end(clave)
+            while len(self.entradas) > self.tam_max:
+                self.entradas.popitem(last=False)
+
+    def resumen(self):
+        if self.tam_max <= 0:
+            return "[memo] Apagado (--memo 0)"
+        total = self.aciertos + self.fallos
+        tasa = self.aciertos / total if total else 0.0
+        return (f"[memo] Aciertos: {self.aciertos}  Fallos: {self.fallos}  ({tasa:.1%})  "
+                f"Entradas: {len(self.entradas)}/{self.tam_max}")
+
+memo_palabras = MemoPalabras()
+
+def memo_activo():
+    """El memo para pasarle a ReedSolomonEuclides, o None si está apagado (--memo 0)."""
+    return memo_palabras if memo_palabras.tam_max > 0 else None
 
-def leer_A2(path, n=15):
-    raw = open(path, "rb").read()
-    syms = [asciihex_to_symbol(b) for b in raw if b not in b"\r\n\t "]
+# =====================================================================
+# Lectura A2 en 1 línea o varias
+# =====================================================================
 
-    if len(syms) % n != 0:
+# Dígitos hex -> 0..15; cualquier otro byte -> 0xFF (inválido). Sin esto
+# los bytes 0x00..0x0F pasarían como símbolos.
+HEX_A_SIMBOLO = bytes(b"0123456789ABCDEF".find(bytes([c])) & 0xFF for c in range(256))
+
+def hex_a_simbolos(raw):
+    syms = raw.translate(HEX_A_SIMBOLO, b"\r\n\t ")
+    if syms and max(syms) > 15:
+        raise ValueError("Símbolos hex inválidos.")
+    return syms
+
+class PalabrasRS:
+    """
+    Todas las palabras del archivo en un único bytearray (un símbolo por
+    byte). Cada palabra se entrega como memoryview, sin copiar.
+    """
+    __slots__ = ("buf", "n", "_mv")
+
+    def __init__(self, buf, n=15):
+        self.buf = buf
+        self.n = n
+        self._mv = memoryview(buf)
+
+    def __len__(self):
+        return len(self.buf) // self.n
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._mv[i*self.n:(i+1)*self.n]
+
+    def __iter__(self):
+        n = self.n
+        for i in range(0, len(self) * n, n):
+            yield self._mv[i:i+n]
+
+    def simbolos(self, i0, i1):
+        """Símbolos de las palabras [i0, i1), contiguos."""
+        return self._mv[i0*self.n:i1*self.n]
+
+def separar_cabecera(raw):
+    """
+    Separa las líneas '#clave=valor' del principio del archivo (si las hay).
+    Los archivos sin cabecera devuelven meta vacío.
+    """
+    meta = {}
+    pos = 0
+    while raw.startswith(b"#", pos):
+        fin = raw.find(b"\n", pos)
+        if fin == -1:
+            fin = len(raw)
+        clave, _, valor = raw[pos+1:fin].decode("ascii").strip().partition("=")
+        meta[clave] = valor
+        pos = fin + 1
+    return meta, raw[pos:]
+
+def leer_cabecera(path):
+    with open(path, "rb") as f:
+        raw = b""
+        # peek: no leer la primera línea de símbolos (puede ser todo el archivo)
+        while f.peek(1)[:1] == b"#":
+            raw += f.readline()
+    return separar_cabecera(raw)[0]
+
+def leer_A2(path, n=15, k=9):
+    """Devuelve (palabras, geometría); la última palabra acortada se completa con ceros."""
+    meta, raw = separar_cabecera(open(path, "rb").read())
+    syms = bytearray(hex_a_simbolos(raw))
+
+    if "largo" not in meta and len(syms) % n != 0:
         raise ValueError("El archivo no es múltiplo de 15 símbolos.")
 
-    return [syms[i:i+n] for i in range(0, len(syms), n)]
+    geo = Geometria(meta, len(syms), n, k)
+    syms.extend(bytes(n - geo.ultima))
+    return PalabrasRS(syms, n), geo
+
+# =====================================================================
+# Geometría: cantidad de palabras y última palabra acortada
+# =====================================================================
+
+class Geometria:
+    """
+    Cuántas palabras hay y cuántos símbolos se transmitieron de la última.
+    Con '#largo' (largo exacto de A1) la última palabra va acortada: sólo
+    sus n-k paridades y los nibbles de info reales; el resto son ceros
+    que no se transmiten. Sin '#largo' (formato viejo) todas las palabras
+    están completas y la última viene rellena con ceros.
+    """
+    __slots__ = ("n", "k", "palabras", "ultima", "largo")
+
+    def __init__(self, meta, total_simbolos, n=15, k=9):
+        self.n = n
+        self.k = k
+        if "largo" in meta:
+            self.largo = int(meta["largo"])
+            nibbles = 2 * self.largo
+            self.palabras = -(-nibbles // k)
+            self.ultima = n - k + nibbles - k * (self.palabras - 1) if self.palabras else n
+            esperado = n * (self.palabras - 1) + self.ultima if self.palabras else 0
+            if total_simbolos != esperado:
+                raise ValueError(f"Se esperaban {esperado} símbolos y hay {total_simbolos}.")
+        else:
+            self.largo = None
+            self.palabras = total_simbolos // n
+            self.ultima = n
+
+    def validas(self, idx):
+        """
+        Posiciones transmitidas de la palabra idx, o None si está completa
+        (todas menos, a veces, la última). Con None la palabra puede usar
+        el memo de palabras repetidas.
+        """
+        if idx == self.palabras - 1 and self.ultima < self.n:
+            return self.ultima
+        return None
+
+    def total_bytes(self):
+        if self.largo is not None:
+            return self.largo
+        return self.palabras * self.k // 2
+
+# =====================================================================
+# Digests por bloque
+# =====================================================================
+
+def bloques_limpios(palabras, meta):
+    """
+    Compara el CRC32 de cada bloque de N palabras con el de la cabecera.
+    Devuelve (conjunto de bloques que coinciden, N). Sin digests: (set(), 1).
+    """
+    if "digests" not in meta:
+        return set(), 1
+
+    n_bloque = int(meta["digest_bloque"])
+    digests = [int(d, 16) for d in meta["digests"].split(",") if d]
+
+    limpios = set()
+    for b, d in enumerate(digests):
+        if zlib.crc32(palabras.simbolos(b*n_bloque, (b+1)*n_bloque)) == d:
+            limpios.add(b)
+    return limpios, n_bloque
 
 # =====================================================================
 # Reconstrucción de bytes
 # =====================================================================
 
-def combinar_nibbles(h, l):
-    return ((h & 0xF) << 4) | (l & 0xF)
+SIMBOLO_A_HEX = bytes.maketrans(bytes(range(16)), b"0123456789ABCDEF")
 
-def reconstruir_bytes(info_blocks):
-    nibbles = []
-    for info in info_blocks:
-        nibbles.extend(info[:9])
+def reconstruir_bytes(nibbles):
+    """
+    nibbles: buffer plano con los 9 nibbles de info de cada palabra, en orden.
+    Un nibble final impar se descarta.
+    """
+    nibbles = bytes(nibbles[:len(nibbles) & ~1])
+    return bytes.fromhex(nibbles.translate(SIMBOLO_A_HEX).decode("ascii"))
+
+# =====================================================================
+# Descompresión Huffman por bloques
+# =====================================================================
 
-    out = []
-    for i in range(0, len(nibbles)-1, 2):
-        out.append(combinar_nibbles(nibbles[i], nibbles[i+1]))
+def descomprimir_bloque(bloque):
+    modo = bloque[0]
+    largo = int.from_bytes(bloque[1:3], "big")
+    if modo == 0:
+        return bytes(bloque[3:3+largo])
+    if modo != 1:
+        raise ValueError(f"Modo de bloque desconocido: {modo}")
+
+    nsim = bloque[3] + 1
+    largos = {bloque[4+2*i]: bloque[5+2*i] for i in range(nsim)}
+
+    # Huffman canónico: (longitud, código) -> símbolo
+    tabla = {}
+    codigo = 0
+    largo_prev = 0
+    for s, l in sorted(largos.items(), key=lambda x: (x[1], x[0])):
+        codigo <<= (l - largo_prev)
+        tabla[(l, codigo)] = s
+        codigo += 1
+        largo_prev = l
+
+    out = bytearray()
+    c = 0
+    l = 0
+    for byte in bloque[4+2*nsim:]:
+        for k in range(7, -1, -1):
+            c = (c << 1) | ((byte >> k) & 1)
+            l += 1
+            s = tabla.get((l, c))
+            if s is not None:
+                out.append(s)
+                if len(out) == largo:
+                    return bytes(out)
+                c = 0
+                l = 0
+    raise ValueError("Bloque comprimido truncado.")
+
+# El flujo comprimido empieza con una tabla de tamaños (2 bytes por
+# bloque, en unidades de BLOQUE_ALINEACION) que va protegida por RS como
+# el resto. Cada bloque repite su tamaño en la cabecera:
+#   [tamaño/9 2B][modo 1B][largo 2B][datos][relleno]
+# Los dos datos se cruzan y cada tamaño se confirma con la cabecera del
+# bloque siguiente, así una palabra perdida o mal corregida (en la tabla
+# o en un bloque) sólo daña su bloque. Con '#bloques' (formato viejo) los
+# tamaños vienen en la cabecera del archivo y los bloques no los repiten.
+BLOQUE_ALINEACION = 9
+CABECERA_BLOQUE = 5
+
+def tabla_bloques(meta):
+    """(cantidad de bloques, bytes que ocupa la tabla de tamaños)."""
+    if "bloques" in meta:   # formato viejo: tamaños en la cabecera
+        return len([t for t in meta["bloques"].split(",") if t]), 0
+    cantidad = -(-int(meta["largo_original"]) // int(meta["bloque"]))
+    return cantidad, -(-2 * cantidad // BLOQUE_ALINEACION) * BLOQUE_ALINEACION
+
+def lector_bytes(data, bytes_perdidos=(), base=0):
+    """
+    leer(ini, fin) sobre los bytes codificados data (data[0] es el offset
+    base). Devuelve None si el tramo toca una palabra perdida; cada una
+    ocupa 5 bytes desde su byte inicial (los 9 nibbles, a medio byte).
+    """
+    perdidos = sorted(bytes_perdidos)
+
+    def leer(ini, fin):
+        i = bisect_left(perdidos, ini - 4)
+        if i < len(perdidos) and perdidos[i] < fin:
+            return None
+        return data[ini - base:fin - base]
+    return leer
+
+def tamanos_bloques(meta, leer):
+    """Tamaño de cada bloque según la tabla (None si la entrada se perdió)."""
+    if "bloques" in meta:
+        return [int(t) for t in meta["bloques"].split(",") if t]
+    cantidad, _ = tabla_bloques(meta)
+    tams = []
+    for b in range(cantidad):
+        entrada = leer(2 * b, 2 * b + 2)
+        tams.append(int.from_bytes(entrada, "big") * BLOQUE_ALINEACION if entrada is not None else None)
+    return tams
+
+def largo_bloque(meta, b):
+    """Bytes de A1 que tiene el bloque b."""
+    tam_bloque = int(meta["bloque"])
+    return min(tam_bloque, int(meta["largo_original"]) - b * tam_bloque)
+
+def max_bloque(meta):
+    """Tamaño máximo de un bloque comprimido (guardado sin comprimir)."""
+    return -(-(CABECERA_BLOQUE + int(meta["bloque"])) // BLOQUE_ALINEACION) * BLOQUE_ALINEACION
+
+def cabecera_bloque(leer, off, meta, b):
+    """
+    Tamaño que declara la cabecera del bloque b si está en off, o None si
+    se perdió o no es coherente (modo 0/1 y largo del bloque b).
+    """
+    cab = leer(off, off + CABECERA_BLOQUE)
+    if cab is None or len(cab) < CABECERA_BLOQUE:
+        return None
+    tam = int.from_bytes(cab[:2], "big") * BLOQUE_ALINEACION
+    if (tam < CABECERA_BLOQUE or tam > max_bloque(meta) or cab[2] > 1
+            or int.from_bytes(cab[3:5], "big") != largo_bloque(meta, b)):
+        return None
+    return tam
+
+def ubicar_bloque(leer, off, b, meta, tam_tabla=None):
+    """
+    Tamaño del bloque b, que empieza en el offset codificado off. Los
+    candidatos son el de su cabecera y el de la tabla; vale el que
+    confirma la cabecera del bloque siguiente. Si ninguno la confirma, se
+    busca esa cabecera hacia adelante (alineada a 9 bytes).
+    Devuelve (tam, sano): sano si la cabecera propia es coherente y
+    coincide; (None, False) si no se puede ubicar.
+    """
+    if "bloques" in meta:
+        return tam_tabla, True
+    cantidad, _ = tabla_bloques(meta)
+    largo = int(meta["largo"])
+    propio = cabecera_bloque(leer, off, meta, b)
+    if b == cantidad - 1:
+        tam = largo - off
+        return (tam, propio == tam) if tam > 0 else (None, False)
+    if propio is not None and propio == tam_tabla:
+        return propio, True
+
+    candidatos = [t for t in (propio, tam_tabla) if t and off + t < largo]
+    for t in candidatos:
+        if cabecera_bloque(leer, off + t, meta, b + 1) is not None:
+            return t, t == propio
+    for t in candidatos:
+        if leer(off + t, off + t + CABECERA_BLOQUE) is None:   # no se puede confirmar
+            return t, t == propio
+    for t in range(BLOQUE_ALINEACION, min(max_bloque(meta), largo - off - 1) + 1, BLOQUE_ALINEACION):
+        if cabecera_bloque(leer, off + t, meta, b + 1) is not None:
+            return t, t == propio
+    return (candidatos[0], False) if candidatos else (None, False)
+
+def descomprimir_ubicado(leer, off, tam, sano, meta, b):
+    """A1 del bloque b ya ubicado; ceros si está dañado o no se ubicó."""
+    if sano:
+        bloque = leer(off, off + tam)
+        if bloque is not None:
+            try:
+                # el formato viejo no repite el tamaño en el bloque
+                return descomprimir_bloque(bloque if "bloques" in meta else bloque[2:])
+            except (ValueError, IndexError):
+                pass
+    return bytes(largo_bloque(meta, b))
+
+def descomprimir_bloques(data, meta, palabras_perdidas=(), k=9):
+    """
+    Invierte la compresión por bloques del codificador (tabla de tamaños
+    y bloques). Los bloques que contienen una palabra irrecuperable se
+    reemplazan por ceros.
+    """
+    # byte de A1 comprimido donde empieza cada palabra perdida
+    bytes_perdidos = [idx * k // 2 for idx in palabras_perdidas]
+    leer = lector_bytes(data, bytes_perdidos)
+    tams = tamanos_bloques(meta, leer)
+
+    cantidad, off = tabla_bloques(meta)
+    out = bytearray()
+    for b in range(cantidad):
+        tam, sano = ubicar_bloque(leer, off, b, meta, tams[b]) if off is not None else (None, False)
+        out += descomprimir_ubicado(leer, off, tam, sano, meta, b)
+        off = off + tam if tam else None
     return bytes(out)
 
+def ubicar_rango(leer, meta, tams, b0):
+    """
+    Offset codificado del bloque b0 para el acceso por rango. Si la tabla
+    está entera hasta b0 se suma y se confirma con la cabecera de b0; si
+    no, se recorren las cabeceras desde el principio. None si no se ubica.
+    """
+    _, off = tabla_bloques(meta)
+    if None not in tams[:b0]:
+        directo = off + sum(tams[:b0])
+        if "bloques" in meta:
+            return directo
+        propio = cabecera_bloque(leer, directo, meta, b0)
+        if propio is not None and tams[b0] in (None, propio):
+            return directo
+    for b in range(b0):
+        tam, _ = ubicar_bloque(leer, off, b, meta, tams[b])
+        if tam is None:
+            return None
+        off += tam
+    return off
+
+def rango_comprimido(leer, meta, tams, offset, largo):
+    """
+    Bytes [offset, offset+largo) de un A1 comprimido: ubica y descomprime
+    sólo los bloques que los cubren (los dañados salen en ceros). tams:
+    tamanos_bloques de la tabla, ya leída.
+    """
+    tam_bloque = int(meta["bloque"])
+    fin = min(offset + largo, int(meta["largo_original"]))
+    if fin <= offset:
+        return b""
+    b0 = offset // tam_bloque
+    b1 = (fin - 1) // tam_bloque
+
+    off = ubicar_rango(leer, meta, tams, b0)
+    out = bytearray()
+    for b in range(b0, b1 + 1):
+        tam, sano = ubicar_bloque(leer, off, b, meta, tams[b]) if off is not None else (None, False)
+        out += descomprimir_ubicado(leer, off, tam, sano, meta, b)
+        off = off + tam if tam else None
+    recorte = offset - b0 * tam_bloque
+    return bytes(out[recorte:recorte + fin - offset])
+
 # =====================================================================
-# MAIN DECODIFICACIÓN
+# Cache de resultados (direccionada por contenido)
+# =====================================================================
+
+VERSION_DECODIFICADOR = "A2-3"
+CARPETA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_rs")
+
+class CacheDecodificacion:
+    """
+    Cache en disco de decodificaciones. La clave es el sha256 del archivo
+    de entrada junto con los parámetros del código y la versión del
+    decodificador; guarda el A1 reconstruido y un .json con estadísticas
+    (correcciones por palabra, irrecuperables). Al pasar tam_max se
+    expulsan las entradas usadas hace más tiempo (LRU por mtime).
+    Los aciertos/fallos se acumulan en contadores.json, que se actualiza
+    bajo un archivo de lock: la comparten varios procesos (demonio).
+    """
+    def __init__(self, carpeta=CARPETA_CACHE, tam_max=256*1024*1024):
+        self.carpeta = carpeta
+        self.tam_max = tam_max
+        self.aciertos = 0
+        self.fallos = 0
+        self.pendientes = {"aciertos": 0, "fallos": 0}   # aún no sumados al archivo
+        os.makedirs(carpeta, exist_ok=True)
+
+    def clave(self, path, n=15, k=9):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for trozo in iter(lambda: f.read(1 << 20), b""):
+                h.update(trozo)
+        h.update(f"|RS({n},{k})|{VERSION_DECODIFICADOR}".encode())
+        return h.hexdigest()
+
+    def _ruta(self, clave, ext):
+        return os.path.join(self.carpeta, clave + ext)
+
+    def obtener(self, clave):
+        """Devuelve (data, info) o None."""
+        try:
+            with open(self._ruta(clave, ".json")) as f:
+                info = json.load(f)
+            with open(self._ruta(clave, ".a1"), "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            self._contar(acierto=False)
+            return None
+        # LRU: la entrada pasa a ser la más reciente
+        os.utime(self._ruta(clave, ".a1"))
+        self._contar(acierto=True)
+        return data, info
+
+    def guardar(self, clave, data, info):
+        self._escribir_atomico(self._ruta(clave, ".a1"), data)
+        self._escribir_atomico(self._ruta(clave, ".json"), json.dumps(info).encode())
+        self.expulsar()
+
+    def expulsar(self):
+        entradas = []
+        total = 0
+        for nombre in os.listdir(self.carpeta):
+            if not nombre.endswith(".a1"):
+                continue
+            a1 = os.path.join(self.carpeta, nombre)
+            js = a1[:-3] + ".json"
+            try:
+                tam = os.path.getsize(a1) + (os.path.getsize(js) if os.path.exists(js) else 0)
+                entradas.append((os.path.getmtime(a1), tam, a1, js))
+            except OSError:
+                continue
+            total += tam
+        for _, tam, a1, js in sorted(entradas):
+            if total <= self.tam_max:
+                break
+            for ruta in (a1, js):
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+            total -= tam
+
+    def _escribir_atomico(self, ruta, contenido):
+        tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(contenido)
+        os.replace(tmp, ruta)
+
+    def _contar(self, acierto):
+        if acierto:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+        self.pendientes["aciertos" if acierto else "fallos"] += 1
+        self._volcar_contadores()
+
+    def _volcar_contadores(self, espera_max=2.0):
+        """
+        Suma los pendientes a contadores.json con el lock tomado (creación
+        exclusiva de contadores.json.lock: anda entre procesos y en
+        cualquier SO). Si no se consigue a tiempo quedan para la próxima.
+        """
+        ruta = os.path.join(self.carpeta, "contadores.json")
+        lock = ruta + ".lock"
+        limite = time.monotonic() + espera_max
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock) > 30:   # abandonado
+                        os.remove(lock)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > limite:
+                    return
+                time.sleep(0.005)
+        try:
+            try:
+                with open(ruta) as f:
+                    cont = json.load(f)
+            except (OSError, ValueError):
+                cont = {"aciertos": 0, "fallos": 0}
+            for clave, valor in self.pendientes.items():
+                cont[clave] += valor
+                self.pendientes[clave] = 0
+            self._escribir_atomico(ruta, json.dumps(cont).encode())
+        finally:
+            os.close(fd)
+            os.remove(lock)
+
+    def contadores(self):
+        """Aciertos/fallos acumulados de todas las ejecuciones."""
+        try:
+            with open(os.path.join(self.carpeta, "contadores.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"aciertos": 0, "fallos": 0}
+
 # =====================================================================
+# Acceso aleatorio a un rango de A1
+# =====================================================================
+
+# Líneas más largas que esto se tratan como cuerpo en una sola línea
+MAX_ANCHO_LINEA = 1 << 16
+
+class FormatoArchivo:
+    """
+    Dónde está cada símbolo dentro del archivo, para leer con seek sin
+    cargar todo. Soporta cuerpo en 1 línea o en líneas de ancho fijo.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.inicio = 0
+            while f.peek(1)[:1] == b"#":
+                self.inicio += len(f.readline())
+            linea = f.readline(MAX_ANCHO_LINEA)
+
+            primera = linea.rstrip(b"\r\n")
+            if b" " in primera or b"\t" in primera:
+                raise ValueError("Formato no soportado para acceso aleatorio.")
+
+            cuerpo = os.fstat(f.fileno()).st_size - self.inicio
+            if not linea.endswith(b"\n"):
+                # una sola línea larga: no se lee entera, sólo el final
+                f.seek(-min(cuerpo, 16), os.SEEK_END)
+                cola = f.read()
+                self.ancho = 0
+                self.paso = 0
+                self.total = cuerpo - (len(cola) - len(cola.rstrip()))
+            elif f.read(len(linea)).strip() == b"":
+                # todo en una sola línea
+                self.ancho = 0
+                self.paso = 0
+                self.total = len(primera)
+            else:
+                self.ancho = len(primera)
+                self.paso = len(linea)
+                # la última línea puede ser más corta (última palabra acortada)
+                f.seek(self.inicio + (cuerpo // self.paso) * self.paso)
+                self.total = (cuerpo // self.paso) * self.ancho + len(f.read().rstrip())
+
+    def posicion(self, s):
+        if self.ancho == 0:
+            return self.inicio + s
+        return self.inicio + (s // self.ancho) * self.paso + s % self.ancho
+
+    def leer_simbolos(self, f, s0, s1):
+        """Símbolos [s0, s1) como bytes con valores 0..15."""
+        if s1 <= s0:
+            return b""
+        f.seek(self.posicion(s0))
+        syms = hex_a_simbolos(f.read(self.posicion(s1 - 1) + 1 - self.posicion(s0)))
+        if len(syms) != s1 - s0:
+            raise ValueError("Formato no soportado para acceso aleatorio.")
+        return syms
+
+def palabras_que_cubren(ini, fin, k=9):
+    """Índices [w0, w1] de las palabras con los nibbles de los bytes [ini, fin)."""
+    return (2 * ini) // k, (2 * fin - 1) // k
+
+def leer_palabras_rango(f, fmt, geo, w0, w1):
+    n = geo.n
+    buf = bytearray(fmt.leer_simbolos(f, w0 * n, min((w1 + 1) * n, fmt.total)))
+    buf.extend(bytes((w1 - w0 + 1) * n - len(buf)))    # última palabra acortada
+    return PalabrasRS(buf, n)
+
+def decodificar_rango(A2_path, offset, largo):
+    """
+    Decodifica sólo los bytes [offset, offset+largo) de A1: lee del A2
+    únicamente las palabras que los cubren (9 nibbles de info c/u).
+    Si A1 viene comprimido lee antes la tabla de tamaños de bloque, y los
+    bloques con una palabra irrecuperable salen en ceros; sin compresión
+    una palabra irrecuperable hace devolver None.
+    """
+    rs = ReedSolomonEuclides(15, 9, memo_activo())
+    meta = leer_cabecera(A2_path)
+    fmt = FormatoArchivo(A2_path)
+    geo = Geometria(meta, fmt.total, rs.n, rs.k)
+
+    with open(A2_path, "rb") as f:
+
+        def bytes_codificados(ini, fin):
+            """Bytes codificados [ini, fin) y offsets (relativos) de las palabras perdidas."""
+            w0, w1 = palabras_que_cubren(ini, fin, rs.k)
+            palabras = leer_palabras_rango(f, fmt, geo, w0, w1)
+
+            infos = bytearray(len(palabras) * rs.k)
+            perdidos = []
+            for i, w in enumerate(palabras):
+                try:
+                    w_corr, info, pos, errores = rs.decodificar_palabra(w, geo.validas(w0 + i))
+                except ValueError as e:
+                    print(f">>> PALABRA IRRECUPERABLE #{w0 + i}:", e)
+                    perdidos.append((w0 + i) * rs.k // 2 - ini)
+                    continue
+                if pos:
+                    print(f"Palabra RS #{w0 + i}: errores corregidos en {pos}")
+                infos[i*rs.k:(i+1)*rs.k] = info
+
+            nib0 = 2 * ini - rs.k * w0
+            return reconstruir_bytes(infos[nib0:nib0 + 2 * (fin - ini)]), perdidos
+
+        if meta.get("comprimido") != "huffman":
+            fin = min(offset + largo, geo.total_bytes())
+            if fin <= offset:
+                return b""
+            data, perdidos = bytes_codificados(offset, fin)
+            return None if perdidos else data
+
+        def leer(ini, fin):
+            fin = min(fin, geo.total_bytes())
+            if fin <= ini:
+                return b""
+            data, perdidos = bytes_codificados(ini, fin)
+            return None if perdidos else data
+
+        _, largo_tabla = tabla_bloques(meta)
+        tabla, perdidos = bytes_codificados(0, largo_tabla) if largo_tabla else (b"", [])
+        tams = tamanos_bloques(meta, lector_bytes(tabla, perdidos))
+        return rango_comprimido(leer, meta, tams, offset, largo)
 
-def decodificar_archivo(A2_path, A1_out):
-    rs = ReedSolomonEuclides(15, 9)
-    palabras = leer_A2(A2_path, 15)
+# =====================================================================
+# MAIN DECODIFICACIÓN
+# =====================================================================
 
-    infos = []
+def decodificar_archivo(A2_path, A1_out, usar_cache=True, verbose=True):
+    """
+    Decodifica A2 completo a A1_out. Devuelve (data, palabras_irrecuperables).
+    Sin compresión una palabra irrecuperable corta todo y data es None;
+    comprimido, sus nibbles quedan en 0 y sólo se pierde su bloque.
+    verbose=False no escribe nada en pantalla (lo usa el demonio, que
+    corre varios archivos a la vez).
+    """
+    log = print if verbose else (lambda *args: None)
+    rs = ReedSolomonEuclides(15, 9, memo_activo())
+
+    cache = CacheDecodificacion() if usar_cache else None
+    if cache is not None:
+        clave = cache.clave(A2_path, rs.n, rs.k)
+        resultado = cache.obtener(clave)
+        if resultado is not None:
+            data, info = resultado
+            log(f"[cache] Acierto ({clave[:12]}): {info['palabras']} palabras, "
+                  f"{info['corregidos']} errores corregidos en {info['con_errores']} palabras.")
+            with open(A1_out, "wb") as f:
+                f.write(data)
+            return data, info["irrecuperables"]
+
+    palabras, geo = leer_A2(A2_path, 15, 9)
+    meta = leer_cabecera(A2_path)
+
+    # Bloques cuyo digest coincide se copian sin calcular síndromes
+    limpios, n_bloque = bloques_limpios(palabras, meta)
+
+    comprimido = meta.get("comprimido") == "huffman"
+    infos = bytearray(len(palabras) * rs.k)
+    correcciones = {}
+    palabras_irrecuperables = []
 
     for idx, w in enumerate(palabras):
-        print(f"\n--- Palabra RS #{idx} ---")
+        if idx // n_bloque in limpios:
+            if idx % n_bloque == 0:
+                log(f"\n--- Bloque #{idx // n_bloque} (palabras {idx}..{min(idx + n_bloque, len(palabras)) - 1}): digest OK ---")
+            infos[idx*rs.k:(idx+1)*rs.k] = w[rs.n-rs.k:]
+            continue
+
+        log(f"\n--- Palabra RS #{idx} ---")
         try:
-            w_corr, info, pos, errores = rs.decodificar_palabra(w)
+            w_corr, info, pos, errores = rs.decodificar_palabra(w, geo.validas(idx))
             if (len(errores) > 3):
                 raise ValueError("Más de 3 errores en una palabra")
             if pos:
-                print(f"Errores detectados: {pos}")
+                correcciones[idx] = len(errores)
+                log(f"Errores detectados: {pos}")
                 for (p, o, m, c) in errores:
-                    print(f"  pos {p}: {o:X} -> {c:X} (e={m:X})")
+                    log(f"  pos {p}: {o:X} -> {c:X} (e={m:X})")
             else:
-                print("Sin errores.")
+                log("Sin errores.")
 
-            infos.append(info)
+            infos[idx*rs.k:(idx+1)*rs.k] = info
 
         except ValueError as e:
-            print(">>> PALABRA IRRECUPERABLE:", e)
-            return
+            log(">>> PALABRA IRRECUPERABLE:", e)
+            if not comprimido:
+                return None, [idx]
+            palabras_irrecuperables.append(idx)  # sus nibbles quedan en 0
+
+    # con '#largo' se descartan los nibbles de relleno de la última palabra
+    data = reconstruir_bytes(infos[:2 * geo.total_bytes()])
+
+    if comprimido:
+        data = descomprimir_bloques(data, meta, palabras_irrecuperables)
+
+    if cache is not None:
+        cache.guardar(clave, data, {
+            "palabras": len(palabras),
+            "con_errores": len(correcciones),
+            "corregidos": sum(correcciones.values()),
+            "correcciones": correcciones,
+            "irrecuperables": palabras_irrecuperables,
+        })
 
-    data = reconstruir_bytes(infos)
     with open(A1_out, "wb") as f:
         f.write(data)
-    return data
+    return data, palabras_irrecuperables
 
 def elegir_archivo_txt(carpeta):
     txts = [f for f in os.listdir(carpeta) if f.lower().endswith(".txt")]
@@ -297,6 +1153,13 @@ if __name__ == "__main__":
     # if carpeta:
     #     base = carpeta
 
+    # --sin-cache: decodificar siempre, sin consultar ni guardar en la cache
+    usar_cache = "--sin-cache" not in sys.argv
+
+    # --memo N: máximo de palabras en el memo de palabras sucias (0 = sin memo)
+    if "--memo" in sys.argv:
+        memo_palabras.tam_max = int(sys.argv[sys.argv.index("--memo") + 1])
+
     A2_path = elegir_archivo_txt(base)
     if A2_path is None:
         print("Cancelado.")
@@ -304,11 +1167,29 @@ if __name__ == "__main__":
 
     out = os.path.join(base, "A1_decodificado.txt")
 
+    rango = input("¿Decodificar sólo un rango de A1? (s/n)> ").lower().startswith("s")
+    if rango:
+        offset = int(input("Offset (byte inicial de A1)> ").strip())
+        largo = int(input("Cantidad de bytes> ").strip())
+        out = os.path.join(base, f"A1_rango_{offset}_{largo}.txt")
+
     try:
-        data = decodificar_archivo(A2_path, out)
+        if rango:
+            data = decodificar_rango(A2_path, offset, largo)
+            if data is not None:
+                with open(out, "wb") as f:
+                    f.write(data)
+        else:
+            data, irrec = decodificar_archivo(A2_path, out, usar_cache)
+            if data is not None and irrec:
+                print(f"\n>>> {len(irrec)} palabra(s) irrecuperables: sus bloques quedan en 0")
         if (data):
             print("\nASCII:", data.decode("ascii", errors="replace"))
             print("Salida guardada en:", out)
+        if usar_cache and not rango:
+            cont = CacheDecodificacion().contadores()
+            print(f"[cache] Aciertos: {cont['aciertos']}  Fallos: {cont['fallos']}")
+        print(memo_palabras.resumen())
     except Exception as e:
         print("✗ Error general:", e)
         raise
\ No newline at end of file
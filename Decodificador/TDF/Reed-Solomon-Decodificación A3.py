@@ -6,6 +6,21 @@ GF(16), polinomio x^4 + x + 1.
 import os
 import sys
 import random
+import zlib
+import json
+import hashlib
+import time
+import mmap
+import queue
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+try:
+    import numpy as np      # opcional: decodificación por lotes
+except ImportError:
+    np = None
 
 # =====================================================================
 # GF(16) = GF(2)[x] / (x^4 + x + 1)
@@ -59,6 +74,29 @@ class GF16:
 
 gf16 = GF16()
 
+# =====================================================================
+# Palabras y correcciones
+# =====================================================================
+
+class ErroresPalabra:
+    """
+    Correcciones de una palabra. Sólo se crea para palabras con errores;
+    al iterar devuelve (pos, original, magnitud, corregido).
+    """
+    __slots__ = ("pos", "orig", "mags")
+
+    def __init__(self, pos, orig, mags):
+        self.pos = pos
+        self.orig = orig
+        self.mags = mags
+
+    def __len__(self):
+        return len(self.pos)
+
+    def __iter__(self):
+        for p, o, m in zip(self.pos, self.orig, self.mags):
+            yield p, o, m, gf16.add(o, m)
+
 # =====================================================================
 # Polinomios sobre GF(16)
 # =====================================================================
@@ -117,18 +155,50 @@ def poly_derivative(p):
         d.append(p[i] if i % 2 == 1 else 0)
     return trim(d)
 
+def desempaquetar_sindromes(S, cantidad):
+    return [(S >> (4 * i)) & 0xF for i in range(cantidad)]
+
 # =====================================================================
 # Reed-Solomon RS(15,9) por Euclides
 # =====================================================================
 
 class ReedSolomonEuclides:
-    def __init__(self, n=15, k=9):
+    def __init__(self, n=15, k=9, memo=None):
         self.n = n
         self.k = k
         self.t = (n - k) // 2
+        self.memo = memo
+
+        # Los síndromes son lineales en los símbolos recibidos:
+        # tabla_sindromes[p][s] = aporte del símbolo s en la posición p a
+        # S1..S(2t), empaquetados de a un nibble (S1 en los 4 bits bajos).
+        self.tabla_sindromes = [
+            [sum(gf16.mul2(s, gf16.exp[(i * p) % 15]) << (4 * (i - 1))
+                 for i in range(1, 2*self.t + 1))
+             for s in range(16)]
+            for p in range(n)
+        ]
 
-    def syndromes(self, w):
-        return [poly_eval(w, gf16.exp[i]) for i in range(1, 2*self.t + 1)]
+        # Λ(x) = (1 + X1·x)(1 + X2·x) -> (Λ1, Λ2) = (X1 + X2, X1·X2):
+        # raices_dos[(Λ1 << 4) | Λ2] = posiciones (p1, p2) de los dos errores
+        self.raices_dos = {}
+        for p1 in range(n):
+            for p2 in range(p1 + 1, n):
+                X1, X2 = gf16.exp[p1], gf16.exp[p2]
+                self.raices_dos[((X1 ^ X2) << 4) | gf16.mul2(X1, X2)] = (p1, p2)
+
+    def syndromes(self, w, empaquetado=False):
+        """
+        Síndromes S1..S(2t) como XOR de n entradas de tabla_sindromes.
+        Con empaquetado=True devuelve el int de 4·2t bits (0 = sin errores),
+        útil como clave de diccionario.
+        """
+        S = 0
+        for fila, s in zip(self.tabla_sindromes, w):
+            S ^= fila[s]
+        if empaquetado:
+            return S
+        return desempaquetar_sindromes(S, 2*self.t)
 
     def euclides(self, S):
         r_prev = [0]*(2*self.t) + [1]
@@ -167,39 +237,479 @@ class ReedSolomonEuclides:
             mags.append(gf16.div2(num, den))
         return mags
 
-    def decodificar_palabra(self, w, verbose=False):
-        S = self.syndromes(w)
+    def errores_pocos(self, S_emp):
+        """
+        Soluciones cerradas para 1 y 2 errores (Peterson). Devuelve
+        (posiciones, magnitudes) sólo si reproducen los 2t síndromes;
+        si no, None y se usa Euclides + Chien + Forney.
+        """
+        S1, S2, S3, S4 = desempaquetar_sindromes(S_emp, 4)
+        mul, div, exp = gf16.mul2, gf16.div2, gf16.exp
+
+        # 1 error: S(i+1) = S(i)·X  ->  X = S2/S1, e = S1/X
+        if S1 and S2:
+            p = gf16.log[div(S2, S1)]
+            e = div(S1, exp[p])
+            if self.tabla_sindromes[p][e] == S_emp:
+                return [p], [e]
+
+        # 2 errores: [S2 S1; S3 S2]·[L1; L2] = [S3; S4]
+        det = mul(S2, S2) ^ mul(S1, S3)
+        if det == 0:
+            return None
+        L1 = div(mul(S3, S2) ^ mul(S1, S4), det)
+        L2 = div(mul(S2, S4) ^ mul(S3, S3), det)
+        par = self.raices_dos.get((L1 << 4) | L2)
+        if par is None:
+            return None
+
+        # magnitudes: [X1 X2; X1² X2²]·[e1; e2] = [S1; S2]
+        p1, p2 = par
+        X1, X2 = exp[p1], exp[p2]
+        d = mul(mul(X1, X2), X1 ^ X2)
+        e1 = div(mul(S1, mul(X2, X2)) ^ mul(S2, X2), d)
+        e2 = div(mul(S1, mul(X1, X1)) ^ mul(S2, X1), d)
+        if e1 and e2 and self.tabla_sindromes[p1][e1] ^ self.tabla_sindromes[p2][e2] == S_emp:
+            return [p1, p2], [e1, e2]
+        return None
+
+    def decodificar_palabra(self, w, verbose=False, validas=None):
+        S_emp = self.syndromes(w, empaquetado=True)
         
         if verbose:
-            print("  Síndromes:", [f"{s:X}" for s in S])
+            print("  Síndromes:", [f"{s:X}" for s in desempaquetar_sindromes(S_emp, 2*self.t)])
+
+        if S_emp == 0:
+            return w, w[self.n-self.k:], (), ()
+
+        # Palabras sucias repetidas: el resultado sale del memo
+        clave = None
+        if self.memo is not None and validas is None:
+            clave = self.memo.clave(w)
+            res = self.memo.obtener(clave)
+            if isinstance(res, str):
+                raise ValueError(res)
+            if res is not None:
+                return self.aplicar(w, *desempaquetar_errores(res))
+        try:
+            pos, mags = self.corregir(S_emp, validas)
+        except ValueError as e:
+            if clave is not None:
+                self.memo.guardar(clave, sys.intern(str(e)))
+            raise
+        if clave is not None:
+            self.memo.guardar(clave, empaquetar_errores(pos, mags))
+        return self.aplicar(w, pos, mags)
 
-        if all(s == 0 for s in S):
-            return w, w[self.n-self.k:], [], []
+    def corregir(self, S_emp, validas=None):
+        """Posiciones y magnitudes a partir de los síndromes (empaquetados)."""
+        rapido = self.errores_pocos(S_emp)
+        if rapido is not None:
+            pos, mags = rapido
+        else:
+            S = desempaquetar_sindromes(S_emp, 2*self.t)
+            L_raw, O_raw = self.euclides(S)
+            Lambda, Omega = self.normalizar(L_raw, O_raw)
+            pos = self.chien(Lambda)
+
+            if len(pos) > self.t:
+                raise ValueError(f"Más de {self.t} errores – palabra irrecuperable.")
 
-        L_raw, O_raw = self.euclides(S)
-        Lambda, Omega = self.normalizar(L_raw, O_raw)
-        pos = self.chien(Lambda)
+            mags = self.forney(Omega, Lambda, pos)
 
-        if len(pos) > self.t:
-            raise ValueError(f"Más de {self.t} errores – palabra irrecuperable.")
+        # palabra acortada: las posiciones >= validas no se transmitieron (son 0)
+        if validas is not None and any(p >= validas for p in pos):
+            raise ValueError("Error en posición no transmitida – palabra irrecuperable.")
 
-        mags = self.forney(Omega, Lambda, pos)
+        return pos, mags
 
-        w_corr = w[:]
-        errores = []
+    def aplicar(self, w, pos, mags):
+        """Corrige w con los errores (pos, mags): (w_corr, info, pos, errores)."""
+        w_corr = bytearray(w)
+        errores = ErroresPalabra(pos, [w_corr[p] for p in pos], mags)
         for p, m in zip(pos, mags):
-            orig = w_corr[p]
-            corr = gf16.add(orig, m)
-            errores.append((p, orig, m, corr))
-            w_corr[p] = corr
+            w_corr[p] = gf16.add(w_corr[p], m)
+
+        w_corr = bytes(w_corr)
+        return w_corr, w_corr[self.n-self.k:], tuple(pos), errores
+
+# =====================================================================
+# Memo de palabras sucias repetidas
+# =====================================================================
+
+# ~135 bytes por entrada (medido con tracemalloc): clave y valor son ints
+# chicos, más el nodo del OrderedDict
+BYTES_POR_ENTRADA_MEMO = 135
+MEMO_MAX_PALABRAS = 1 << 15
+
+def empaquetar_errores(pos, mags):
+    """Errores de una palabra en un int: un 1 inicial y un byte (pos << 4 | magnitud) por error."""
+    v = 1
+    for p, m in zip(reversed(pos), reversed(mags)):
+        v = v << 8 | p << 4 | m
+    return v
+
+def desempaquetar_errores(v):
+    pos, mags = [], []
+    while v > 1:
+        pos.append(v >> 4 & 0xF)
+        mags.append(v & 0xF)
+        v >>= 8
+    return pos, mags
+
+class MemoPalabras:
+    """
+    LRU acotado: palabra recibida (15 nibbles empaquetados en un int de
+    60 bits) -> sus errores (empaquetar_errores), o el mensaje de error si
+    fue irrecuperable; la palabra corregida se rearma en cada acierto.
+    Texto codificado y zonas de relleno repiten muchas palabras
+    idénticas; cada copia se corrige una sola vez.
+    Lleva lock porque lo comparten los hilos trabajadores (con procesos
+    cada trabajador tiene el suyo).
+    """
+    def __init__(self, tam_max=MEMO_MAX_PALABRAS):
+        self.tam_max = tam_max
+        self.entradas = OrderedDict()
+        self.lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(w):
+        return int(bytes(w).translate(SIMBOLO_A_HEX), 16)
+
+    def obtener(self, clave):
+        with self.lock:
+            res = self.entradas.get(clave)
+            if res is None:
+                self.fallos += 1
+            else:
+                self.entradas.move_to_end(clave)
+                self.aciertos += 1
+            return res
+
+    def obtener_varios(self, claves, repetidas=0):
+        """
+        obtener() para una lista de claves, con un solo lock. `repetidas`
+        son copias que se resolvieron junto con otra y cuentan como aciertos.
+        """
+        with self.lock:
+            res = [self.entradas.get(c) for c in claves]
+            for c, r in zip(claves, res):
+                if r is not None:
+                    self.entradas.move_to_end(c)
+            halladas = len(res) - res.count(None)
+            self.aciertos += halladas + repetidas
+            self.fallos += len(res) - halladas
+            return res
+
+    def guardar(self, clave, res):
+        with self.lock:
+            self.entradas[clave] = res
+            self.entradas.move_to_end(clave)
+            while len(self.entradas) > self.tam_max:
+                self.entradas.popitem(last=False)
+
+    def guardar_varios(self, pares):
+        """
+        guardar() para una lista de pares (clave, res) que recién dieron
+        fallo, con un solo lock. Se descarta antes de agregar, así la tabla
+        nunca pasa de tam_max entradas.
+        """
+        with self.lock:
+            pares = pares[len(pares) - self.tam_max:] if len(pares) > self.tam_max else pares
+            for _ in range(len(self.entradas) + len(pares) - self.tam_max):
+                self.entradas.popitem(last=False)
+            self.entradas.update(pares)
+
+    def limitar(self, tam_max):
+        """Baja (nunca sube) el máximo de entradas y descarta las que sobran."""
+        with self.lock:
+            self.tam_max = min(self.tam_max, tam_max)
+            while len(self.entradas) > self.tam_max:
+                self.entradas.popitem(last=False)
+
+    def resumen(self):
+        if self.tam_max <= 0:
+            return "[memo] Apagado (--memo 0)"
+        total = self.aciertos + self.fallos
+        tasa = self.aciertos / total if total else 0.0
+        return (f"[memo] Aciertos: {self.aciertos}  Fallos: {self.fallos}  ({tasa:.1%})  "
+                f"Entradas: {len(self.entradas)}/{self.tam_max}")
+
+memo_palabras = MemoPalabras()
+
+def memo_activo():
+    """El memo para pasarle a ReedSolomonEuclides, o None si está apagado (--memo 0)."""
+    return memo_palabras if memo_palabras.tam_max > 0 else None
+
+# =====================================================================
+# Decodificación por lotes con NumPy (opcional)
+# =====================================================================
+#
+# Para archivos con muchas palabras sucias (ráfagas en A3) el costo está
+# en resolver la ecuación clave palabra por palabra. Acá se hace para
+# miles de palabras a la vez: Berlekamp–Massey con L, m y b por palabra
+# (las ramas se vuelven máscaras), y Chien y Forney como evaluaciones en
+# las 15 posiciones de todas las palabras juntas. Sin NumPy se usa el
+# decodificador palabra por palabra.
+
+# Palabras por lote: acota los temporales (índices int64 de BM, (N, n) de
+# Chien/Forney) a unos cientos de KB sin importar el tamaño de la ventana.
+LOTE_PALABRAS = 1024
+
+class DecodificadorLotes:
+    def __init__(self, n=15, k=9):
+        self.n = n
+        self.k = k
+        self.t = (n - k) // 2
+        self.mul = np.array(gf16.mul, dtype=np.uint8)
+        self.inv = np.array([gf16.div2(1, a) if a else 0 for a in range(16)], dtype=np.uint8)
+        # pot[j][i] = α^((j+1)·i): peso del símbolo i en el síndrome S(j+1)
+        self.pot = np.array([[gf16.exp[((j + 1) * i) % 15] for i in range(n)]
+                             for j in range(2*self.t)], dtype=np.uint8)
+        # pot_inv[i][p] = α^(-p·i): término i de un polinomio evaluado en α^(-p)
+        self.pot_inv = np.array([[gf16.exp[(-p * i) % 15] for p in range(n)]
+                                 for i in range(2*self.t + 1)], dtype=np.uint8)
+        self.rs = ReedSolomonEuclides(n, k)
+
+    def sindromes(self, W):
+        """W: (N, n) símbolos -> (N, 2t) síndromes S1..S(2t)."""
+        S = np.empty((len(W), 2*self.t), dtype=np.uint8)
+        for j in range(2*self.t):
+            S[:, j] = np.bitwise_xor.reduce(self.mul[W, self.pot[j]], axis=1)
+        return S
+
+    def evaluar(self, P):
+        """P: (N, g) coeficientes de menor a mayor -> (N, n) valores en α^(-p)."""
+        V = np.zeros((len(P), self.n), dtype=np.uint8)
+        for i in range(P.shape[1]):
+            V ^= self.mul[P[:, i, None], self.pot_inv[i]]
+        return V
+
+    def berlekamp_massey(self, S):
+        """Λ(x) de cada palabra (N, 2t+1) y su grado L (N,)."""
+        N, dos_t = S.shape
+        mul = self.mul
+        C = np.zeros((N, dos_t + 1), dtype=np.uint8)
+        C[:, 0] = 1
+        B = C.copy()
+        L = np.zeros(N, dtype=np.int64)
+        m = np.ones(N, dtype=np.int64)
+        b = np.ones(N, dtype=np.uint8)
+        col = np.arange(dos_t + 1)
+
+        for r in range(dos_t):
+            d = S[:, r].copy()
+            for i in range(1, r + 1):
+                d ^= mul[C[:, i], S[:, r - i]]
+            hay = d != 0
+            crece = hay & (2 * L <= r)
+
+            # C - (d/b)·x^m·B, con m distinto en cada palabra
+            idx = col - m[:, None]
+            Bm = np.where(idx >= 0, np.take_along_axis(B, np.maximum(idx, 0), axis=1), 0)
+            T = C ^ mul[mul[d, self.inv[b]][:, None], Bm]
+
+            B = np.where(crece[:, None], C, B)
+            b = np.where(crece, d, b)
+            L = np.where(crece, r + 1 - L, L)
+            m = np.where(crece, 1, m + 1)
+            C = np.where(hay[:, None], T, C)
+        return C, L
+
+    def decodificar(self, buf, validas_ultima=None, limpias=None):
+        """
+        Decodifica todas las palabras de buf (símbolos en orden de palabra).
+        Devuelve (W, nerr): W (N, n) con las palabras corregidas y nerr la
+        cantidad de errores corregidos en cada una (-1 = irrecuperable).
+        validas_ultima: posiciones transmitidas de la última palabra de buf
+        (si es la última del archivo y va acortada).
+        limpias: máscara (N,) de palabras de bloques con digest OK; no se
+        les calculan síndromes.
+        Las palabras se resuelven de a LOTE_PALABRAS, así los temporales
+        no crecen con el tamaño de buf.
+        """
+        W = np.frombuffer(buf, dtype=np.uint8).reshape(-1, self.n).copy()
+        nerr = np.zeros(len(W), dtype=np.int8)
+        if limpias is not None:
+            limpias = np.frombuffer(limpias, dtype=np.bool_)
+
+        for i0 in range(0, len(W), LOTE_PALABRAS):
+            i1 = min(i0 + LOTE_PALABRAS, len(W))
+            if limpias is None:
+                filas = np.arange(i0, i1)
+            else:
+                filas = i0 + np.flatnonzero(~limpias[i0:i1])
+            validas = validas_ultima if i1 == len(W) else None
+            self.decodificar_lote(W, nerr, filas, validas)
+        return W, nerr
+
+    def decodificar_lote(self, W, nerr, filas, validas_ultima=None):
+        """Corrige en W (y anota en nerr) las palabras `filas` que den síndrome != 0."""
+        S = self.sindromes(W[filas])
+        hay = S.any(axis=1)
+        sucias = filas[hay]
+        if len(sucias) == 0:
+            return
+        S = S[hay]
+        acortada = validas_ultima is not None and validas_ultima < self.n
+
+        # Palabras sucias repetidas: cada palabra distinta se resuelve una
+        # sola vez, y las que ya están en el memo no se resuelven.
+        memo = memo_activo()
+        if memo is not None:
+            claves = np.zeros(len(sucias), dtype=np.int64)
+            for i in range(self.n):
+                claves = claves << 4 | W[sucias, i]
+            if acortada and sucias[-1] == len(W) - 1:
+                claves[-1] = -1     # la última acortada no pasa por el memo
+            claves, primera, grupo = np.unique(claves, return_index=True, return_inverse=True)
+            claves = claves.tolist()
+            todas, sucias, S = sucias, sucias[primera], S[primera]
+            conocidas = memo.obtener_varios(claves, repetidas=len(todas) - len(claves))
+        else:
+            claves, conocidas = None, [None] * len(sucias)
+
+        # E: errores de cada palabra distinta; cnt: cuántos (-1 = irrecuperable).
+        # Lo que vino del memo se desempaqueta de un byte (pos << 4 | mag) por vez.
+        E = np.zeros((len(sucias), self.n), dtype=np.uint8)
+        v = np.array([0 if r is None else -1 if isinstance(r, str) else r for r in conocidas],
+                     dtype=np.int64)
+        nuevas = np.flatnonzero(v == 0)
+        cnt = np.where(v < 0, -1, 0).astype(np.int8)
+        for _ in range(self.t):
+            fil = np.flatnonzero(v > 1)
+            E[fil, v[fil] >> 4 & 0xF] = v[fil] & 0xF
+            cnt[fil] += 1
+            v[fil] >>= 8
+
+        if len(nuevas):
+            resultados = self.resolver(W, sucias[nuevas], S[nuevas], E, cnt, nuevas,
+                                       validas_ultima if acortada else None)
+            if claves is not None:
+                memo.guardar_varios([(claves[u], res) for u, res in zip(nuevas.tolist(), resultados)
+                                     if claves[u] >= 0])
+
+        if claves is None:
+            W[sucias] ^= E
+            nerr[sucias] = cnt
+        else:
+            W[todas] ^= E[grupo]
+            nerr[todas] = cnt[grupo]
+
+    def resolver(self, W, sucias, S, E, cnt, destino, validas_ultima=None):
+        """
+        Berlekamp–Massey, Chien y Forney para las palabras `sucias` (S: sus
+        síndromes). Deja sus errores en E[destino] y cuántos son en
+        cnt[destino]. Devuelve, para el memo, el resultado de cada una
+        (empaquetar_errores, o el mensaje si es irrecuperable).
+        """
+        n, t = self.n, self.t
+        C, L = self.berlekamp_massey(S)
+        raices = self.evaluar(C) == 0
+
+        # Ω(x) = S(x)·Λ(x) mod x^(2t);  Λ'(x): sólo quedan los términos impares
+        Om = np.zeros_like(S)
+        for j in range(2*t):
+            for i in range(j + 1):
+                Om[:, j] ^= self.mul[C[:, i], S[:, j - i]]
+        Cp = np.zeros_like(S)
+        Cp[:, 0::2] = C[:, 1::2]
+        num = self.evaluar(Om)
+        den = self.evaluar(Cp)
+        mags = self.mul[num, self.inv[den]]
+        mags[~raices] = 0
+
+        # Las que no cierran (raíces != L, L > t, magnitud nula) van al
+        # decodificador palabra por palabra, que decide igual que siempre.
+        ok = (raices.sum(axis=1) == L) & (L <= t) & ((mags != 0) == raices).all(axis=1)
+        ultima = sucias == len(W) - 1
+        if validas_ultima is not None:
+            ok &= ~(ultima & raices[:, validas_ultima:].any(axis=1))
+
+        E[destino[ok]] = mags[ok]
+        cnt[destino[ok]] = L[ok]
+
+        # empaquetar_errores de todas juntas: la posición más baja queda en
+        # el byte más bajo
+        paquete = np.ones(len(sucias), dtype=np.int64)
+        for p in range(n - 1, -1, -1):
+            paquete = np.where(mags[:, p] != 0, paquete << 8 | p << 4 | mags[:, p], paquete)
+        resultados = paquete.tolist()
+        for i in np.flatnonzero(~ok).tolist():
+            w = bytes(W[sucias[i]])
+            try:
+                pos, m = self.rs.corregir(self.rs.syndromes(w, empaquetado=True),
+                                          validas_ultima if ultima[i] else None)
+            except ValueError as e:
+                cnt[destino[i]] = -1
+                resultados[i] = sys.intern(str(e))
+                continue
+            E[destino[i], pos] = m
+            cnt[destino[i]] = len(pos)
+            resultados[i] = empaquetar_errores(pos, m)
+        return resultados
+
+lotes_np = DecodificadorLotes() if np is not None else None
+
+# =====================================================================
+# Geometría: cantidad de palabras y última palabra acortada
+# =====================================================================
+
+class Geometria:
+    """
+    Cuántas palabras hay y cuántos símbolos se transmitieron de la última.
+    Con '#largo' (largo exacto de A1) la última palabra va acortada: sólo
+    sus n-k paridades y los nibbles de info reales; el resto son ceros
+    que no se transmiten. Sin '#largo' (formato viejo) todas las palabras
+    están completas y la última viene rellena con ceros.
+    """
+    __slots__ = ("n", "k", "palabras", "ultima", "largo")
+
+    def __init__(self, meta, total_simbolos, n=15, k=9):
+        self.n = n
+        self.k = k
+        if "largo" in meta:
+            self.largo = int(meta["largo"])
+            nibbles = 2 * self.largo
+            self.palabras = -(-nibbles // k)
+            self.ultima = n - k + nibbles - k * (self.palabras - 1) if self.palabras else n
+            esperado = n * (self.palabras - 1) + self.ultima if self.palabras else 0
+            if total_simbolos != esperado:
+                raise ValueError(f"Se esperaban {esperado} símbolos y hay {total_simbolos}.")
+        else:
+            self.largo = None
+            self.palabras = total_simbolos // n
+            self.ultima = n
+
+    def validas(self, idx):
+        """
+        Posiciones transmitidas de la palabra idx, o None si está completa
+        (todas menos, a veces, la última). Con None la palabra puede usar
+        el memo de palabras repetidas.
+        """
+        if idx == self.palabras - 1 and self.ultima < self.n:
+            return self.ultima
+        return None
 
-        return w_corr, w_corr[self.n-self.k:], pos, errores
+    def total_bytes(self):
+        if self.largo is not None:
+            return self.largo
+        return self.palabras * self.k // 2
+
+    def inicio_columna(self, j):
+        """Offset (en símbolos) de la columna j dentro del A3."""
+        return j * self.palabras - max(0, j - self.ultima)
+
+    def largo_columna(self, j):
+        return self.palabras if j < self.ultima else self.palabras - 1
 
 # =====================================================================
 # DESENTRELAZADO ORIGINAL (columna por columna de TODAS las palabras)
 # =====================================================================
 
-def desentrelazar_codigos_original(datos_entrelazados, num_palabras, n=15):
+def desentrelazar_codigos_original(datos_entrelazados, num_palabras, n=15, geo=None):
     """
     Invierte el entrelazado ORIGINAL que lee columna por columna.
     
@@ -208,37 +718,100 @@ def desentrelazar_codigos_original(datos_entrelazados, num_palabras, n=15):
     - Luego columna 1 de palabra 0, 1, 2, ..., M-1
     - etc.
     
-    Entrada: lista plana [col0_w0, col0_w1, ..., col0_wM, col1_w0, ...]
-    Salida: matriz [num_palabras x n] con las palabras RS originales.
+    Si la última palabra va acortada (geo), las columnas que no llegan a
+    ella tienen un símbolo menos.
+    
+    Entrada: símbolos planos [col0_w0, col0_w1, ..., col0_wM, col1_w0, ...]
+    Salida: PalabrasRS con las num_palabras palabras RS originales.
     """
-    palabras = [[0]*n for _ in range(num_palabras)]
-    idx = 0
+    buf = bytearray(num_palabras * n)
     
-    # Recorremos columnas primero, luego filas
-    for j in range(n):              # columnas 0..14
-        for i in range(num_palabras):  # palabras 0..M-1
-            if idx < len(datos_entrelazados):
-                palabras[i][j] = datos_entrelazados[idx]
-                idx += 1
+    # Cada columna j va a las posiciones j, j+n, j+2n, ... (símbolos faltantes = 0)
+    for j in range(n):
+        if geo is None:
+            col = datos_entrelazados[j*num_palabras:(j+1)*num_palabras]
+        else:
+            ini = geo.inicio_columna(j)
+            col = datos_entrelazados[ini:ini + geo.largo_columna(j)]
+        buf[j:j + len(col)*n:n] = col
     
-    return palabras
+    return PalabrasRS(buf, n)
 
 
 # =====================================================================
 # Lectura de A3
 # =====================================================================
 
-def asciihex_to_symbol(b):
-    if 48 <= b <= 57: return b - 48
-    if 65 <= b <= 70: return b - 55
-    raise ValueError("Símbolos hex inválidos.")
+# Dígitos hex -> 0..15; cualquier otro byte -> 0xFF (inválido). Sin esto
+# los bytes 0x00..0x0F pasarían como símbolos.
+HEX_A_SIMBOLO = bytes(b"0123456789ABCDEF".find(bytes([c])) & 0xFF for c in range(256))
 
-def leer_A3(path):
-    """Lee A3 y devuelve lista plana de símbolos entrelazados"""
-    raw = open(path, "rb").read()
-    syms = [asciihex_to_symbol(b) for b in raw if b not in b"\r\n\t "]
+def hex_a_simbolos(raw):
+    syms = raw.translate(HEX_A_SIMBOLO, b"\r\n\t ")
+    if syms and max(syms) > 15:
+        raise ValueError("Símbolos hex inválidos.")
     return syms
 
+class PalabrasRS:
+    """
+    Todas las palabras del archivo en un único bytearray (un símbolo por
+    byte). Cada palabra se entrega como memoryview, sin copiar.
+    """
+    __slots__ = ("buf", "n", "_mv")
+
+    def __init__(self, buf, n=15):
+        self.buf = buf
+        self.n = n
+        self._mv = memoryview(buf)
+
+    def __len__(self):
+        return len(self.buf) // self.n
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._mv[i*self.n:(i+1)*self.n]
+
+    def __iter__(self):
+        n = self.n
+        for i in range(0, len(self) * n, n):
+            yield self._mv[i:i+n]
+
+    def simbolos(self, i0, i1):
+        """Símbolos de las palabras [i0, i1), contiguos."""
+        return self._mv[i0*self.n:i1*self.n]
+
+def separar_cabecera(raw):
+    """
+    Separa las líneas '#clave=valor' del principio del archivo (si las hay).
+    Los archivos sin cabecera devuelven meta vacío.
+    """
+    meta = {}
+    pos = 0
+    while raw.startswith(b"#", pos):
+        fin = raw.find(b"\n", pos)
+        if fin == -1:
+            fin = len(raw)
+        clave, _, valor = raw[pos+1:fin].decode("ascii").strip().partition("=")
+        meta[clave] = valor
+        pos = fin + 1
+    return meta, raw[pos:]
+
+def leer_cabecera(path):
+    with open(path, "rb") as f:
+        raw = b""
+        # peek: no leer la primera línea de símbolos (puede ser todo el archivo)
+        while f.peek(1)[:1] == b"#":
+            raw += f.readline()
+    return separar_cabecera(raw)[0]
+
+def leer_A3(path):
+    """Lee A3 y devuelve los símbolos entrelazados (bytearray plano)"""
+    _, raw = separar_cabecera(open(path, "rb").read())
+    return bytearray(hex_a_simbolos(raw))
+
 # =====================================================================
 # Inserción de Ráfagas de Errores
 # =====================================================================
@@ -263,81 +836,672 @@ def insertar_rafaga(simbolos, pos_inicio, longitud):
     
     return datos, cambios
 
+# =====================================================================
+# Digests por bloque
+# =====================================================================
+
+def leer_digests(meta):
+    """(N, [CRC32 de cada bloque de N palabras]) o None si no hay digests."""
+    if "digests" not in meta:
+        return None
+    return int(meta["digest_bloque"]), [int(d, 16) for d in meta["digests"].split(",") if d]
+
+def bloques_limpios(palabras, meta):
+    """
+    Compara el CRC32 de cada bloque de N palabras con el de la cabecera.
+    Devuelve (conjunto de bloques que coinciden, N). Sin digests: (set(), 1).
+    """
+    if "digests" not in meta:
+        return set(), 1
+
+    n_bloque, digests = leer_digests(meta)
+
+    limpios = set()
+    for b, d in enumerate(digests):
+        if zlib.crc32(palabras.simbolos(b*n_bloque, (b+1)*n_bloque)) == d:
+            limpios.add(b)
+    return limpios, n_bloque
+
+def digests_ventana(digests, w0, w1, total_palabras):
+    """
+    De los digests (N, lista), los de bloques que caen enteros en las
+    palabras w0..w1: (N, [(bloque, crc), ...]). Los bloques partidos entre
+    dos ventanas quedan afuera (se decodifican como siempre).
+    """
+    if digests is None:
+        return None
+    n_bloque, lista = digests
+    b0 = -(-w0 // n_bloque)
+    b1 = (w1 + 1) // n_bloque if w1 + 1 < total_palabras else len(lista)
+    return n_bloque, [(b, lista[b]) for b in range(b0, min(b1, len(lista)))]
+
+def palabras_limpias(palabras, w0, digests):
+    """
+    Máscara (un byte por palabra de la ventana que empieza en w0) de las
+    palabras cuyo bloque trae el CRC32 esperado: se copian sin decodificar.
+    """
+    limpias = bytearray(len(palabras))
+    if digests is not None:
+        n_bloque, lista = digests
+        for b, d in lista:
+            i0 = b * n_bloque - w0
+            i1 = min(i0 + n_bloque, len(palabras))
+            if zlib.crc32(palabras.simbolos(i0, i1)) == d:
+                limpias[i0:i1] = b"\x01" * (i1 - i0)
+    return limpias
+
+def alinear_ventana(ventana, digests):
+    """Ventana par y, si hay digests y alcanza, múltiplo de N (sin bloques partidos)."""
+    ventana = max(2, ventana - ventana % 2)
+    if digests is not None:
+        paso = digests[0] * (1 + digests[0] % 2)
+        if ventana >= paso:
+            ventana -= ventana % paso
+    return ventana
+
 # =====================================================================
 # Reconstrucción de bytes
 # =====================================================================
 
-def combinar_nibbles(h, l):
-    return ((h & 0xF) << 4) | (l & 0xF)
+SIMBOLO_A_HEX = bytes.maketrans(bytes(range(16)), b"0123456789ABCDEF")
+
+def reconstruir_bytes(nibbles):
+    """
+    nibbles: buffer plano con los 9 nibbles de info de cada palabra, en orden.
+    Un nibble final impar se descarta.
+    """
+    nibbles = bytes(nibbles[:len(nibbles) & ~1])
+    return bytes.fromhex(nibbles.translate(SIMBOLO_A_HEX).decode("ascii"))
+
+# =====================================================================
+# Descompresión Huffman por bloques
+# =====================================================================
+
+def descomprimir_bloque(bloque):
+    modo = bloque[0]
+    largo = int.from_bytes(bloque[1:3], "big")
+    if modo == 0:
+        return bytes(bloque[3:3+largo])
+    if modo != 1:
+        raise ValueError(f"Modo de bloque desconocido: {modo}")
+
+    nsim = bloque[3] + 1
+    largos = {bloque[4+2*i]: bloque[5+2*i] for i in range(nsim)}
+
+    # Huffman canónico: (longitud, código) -> símbolo
+    tabla = {}
+    codigo = 0
+    largo_prev = 0
+    for s, l in sorted(largos.items(), key=lambda x: (x[1], x[0])):
+        codigo <<= (l - largo_prev)
+        tabla[(l, codigo)] = s
+        codigo += 1
+        largo_prev = l
+
+    out = bytearray()
+    c = 0
+    l = 0
+    for byte in bloque[4+2*nsim:]:
+        for k in range(7, -1, -1):
+            c = (c << 1) | ((byte >> k) & 1)
+            l += 1
+            s = tabla.get((l, c))
+            if s is not None:
+                out.append(s)
+                if len(out) == largo:
+                    return bytes(out)
+                c = 0
+                l = 0
+    raise ValueError("Bloque comprimido truncado.")
+
+# El flujo comprimido empieza con una tabla de tamaños (2 bytes por
+# bloque, en unidades de BLOQUE_ALINEACION) que va protegida por RS como
+# el resto. Cada bloque repite su tamaño en la cabecera:
+#   [tamaño/9 2B][modo 1B][largo 2B][datos][relleno]
+# Los dos datos se cruzan y cada tamaño se confirma con la cabecera del
+# bloque siguiente, así una palabra perdida o mal corregida (en la tabla
+# o en un bloque) sólo daña su bloque. Con '#bloques' (formato viejo) los
+# tamaños vienen en la cabecera del archivo y los bloques no los repiten.
+BLOQUE_ALINEACION = 9
+CABECERA_BLOQUE = 5
+
+def tabla_bloques(meta):
+    """(cantidad de bloques, bytes que ocupa la tabla de tamaños)."""
+    if "bloques" in meta:   # formato viejo: tamaños en la cabecera
+        return len([t for t in meta["bloques"].split(",") if t]), 0
+    cantidad = -(-int(meta["largo_original"]) // int(meta["bloque"]))
+    return cantidad, -(-2 * cantidad // BLOQUE_ALINEACION) * BLOQUE_ALINEACION
+
+def lector_bytes(data, bytes_perdidos=(), base=0):
+    """
+    leer(ini, fin) sobre los bytes codificados data (data[0] es el offset
+    base). Devuelve None si el tramo toca una palabra perdida; cada una
+    ocupa 5 bytes desde su byte inicial (los 9 nibbles, a medio byte).
+    """
+    perdidos = sorted(bytes_perdidos)
+
+    def leer(ini, fin):
+        i = bisect_left(perdidos, ini - 4)
+        if i < len(perdidos) and perdidos[i] < fin:
+            return None
+        return data[ini - base:fin - base]
+    return leer
+
+def tamanos_bloques(meta, leer):
+    """Tamaño de cada bloque según la tabla (None si la entrada se perdió)."""
+    if "bloques" in meta:
+        return [int(t) for t in meta["bloques"].split(",") if t]
+    cantidad, _ = tabla_bloques(meta)
+    tams = []
+    for b in range(cantidad):
+        entrada = leer(2 * b, 2 * b + 2)
+        tams.append(int.from_bytes(entrada, "big") * BLOQUE_ALINEACION if entrada is not None else None)
+    return tams
+
+def largo_bloque(meta, b):
+    """Bytes de A1 que tiene el bloque b."""
+    tam_bloque = int(meta["bloque"])
+    return min(tam_bloque, int(meta["largo_original"]) - b * tam_bloque)
+
+def max_bloque(meta):
+    """Tamaño máximo de un bloque comprimido (guardado sin comprimir)."""
+    return -(-(CABECERA_BLOQUE + int(meta["bloque"])) // BLOQUE_ALINEACION) * BLOQUE_ALINEACION
+
+def cabecera_bloque(leer, off, meta, b):
+    """
+    Tamaño que declara la cabecera del bloque b si está en off, o None si
+    se perdió o no es coherente (modo 0/1 y largo del bloque b).
+    """
+    cab = leer(off, off + CABECERA_BLOQUE)
+    if cab is None or len(cab) < CABECERA_BLOQUE:
+        return None
+    tam = int.from_bytes(cab[:2], "big") * BLOQUE_ALINEACION
+    if (tam < CABECERA_BLOQUE or tam > max_bloque(meta) or cab[2] > 1
+            or int.from_bytes(cab[3:5], "big") != largo_bloque(meta, b)):
+        return None
+    return tam
+
+def ubicar_bloque(leer, off, b, meta, tam_tabla=None):
+    """
+    Tamaño del bloque b, que empieza en el offset codificado off. Los
+    candidatos son el de su cabecera y el de la tabla; vale el que
+    confirma la cabecera del bloque siguiente. Si ninguno la confirma, se
+    busca esa cabecera hacia adelante (alineada a 9 bytes).
+    Devuelve (tam, sano): sano si la cabecera propia es coherente y
+    coincide; (None, False) si no se puede ubicar.
+    """
+    if "bloques" in meta:
+        return tam_tabla, True
+    cantidad, _ = tabla_bloques(meta)
+    largo = int(meta["largo"])
+    propio = cabecera_bloque(leer, off, meta, b)
+    if b == cantidad - 1:
+        tam = largo - off
+        return (tam, propio == tam) if tam > 0 else (None, False)
+    if propio is not None and propio == tam_tabla:
+        return propio, True
+
+    candidatos = [t for t in (propio, tam_tabla) if t and off + t < largo]
+    for t in candidatos:
+        if cabecera_bloque(leer, off + t, meta, b + 1) is not None:
+            return t, t == propio
+    for t in candidatos:
+        if leer(off + t, off + t + CABECERA_BLOQUE) is None:   # no se puede confirmar
+            return t, t == propio
+    for t in range(BLOQUE_ALINEACION, min(max_bloque(meta), largo - off - 1) + 1, BLOQUE_ALINEACION):
+        if cabecera_bloque(leer, off + t, meta, b + 1) is not None:
+            return t, t == propio
+    return (candidatos[0], False) if candidatos else (None, False)
 
-def reconstruir_bytes(info_blocks):
-    nibbles = []
-    for info in info_blocks:
-        nibbles.extend(info[:9])
+def descomprimir_ubicado(leer, off, tam, sano, meta, b):
+    """A1 del bloque b ya ubicado; ceros si está dañado o no se ubicó."""
+    if sano:
+        bloque = leer(off, off + tam)
+        if bloque is not None:
+            try:
+                # el formato viejo no repite el tamaño en el bloque
+                return descomprimir_bloque(bloque if "bloques" in meta else bloque[2:])
+            except (ValueError, IndexError):
+                pass
+    return bytes(largo_bloque(meta, b))
 
-    out = []
-    for i in range(0, len(nibbles)-1, 2):
-        out.append(combinar_nibbles(nibbles[i], nibbles[i+1]))
+def descomprimir_bloques(data, meta, palabras_perdidas=(), k=9):
+    """
+    Invierte la compresión por bloques del codificador (tabla de tamaños
+    y bloques). Los bloques que contienen una palabra irrecuperable se
+    reemplazan por ceros.
+    """
+    # byte de A1 comprimido donde empieza cada palabra perdida
+    bytes_perdidos = [idx * k // 2 for idx in palabras_perdidas]
+    leer = lector_bytes(data, bytes_perdidos)
+    tams = tamanos_bloques(meta, leer)
+
+    cantidad, off = tabla_bloques(meta)
+    out = bytearray()
+    for b in range(cantidad):
+        tam, sano = ubicar_bloque(leer, off, b, meta, tams[b]) if off is not None else (None, False)
+        out += descomprimir_ubicado(leer, off, tam, sano, meta, b)
+        off = off + tam if tam else None
     return bytes(out)
 
+def ubicar_rango(leer, meta, tams, b0):
+    """
+    Offset codificado del bloque b0 para el acceso por rango. Si la tabla
+    está entera hasta b0 se suma y se confirma con la cabecera de b0; si
+    no, se recorren las cabeceras desde el principio. None si no se ubica.
+    """
+    _, off = tabla_bloques(meta)
+    if None not in tams[:b0]:
+        directo = off + sum(tams[:b0])
+        if "bloques" in meta:
+            return directo
+        propio = cabecera_bloque(leer, directo, meta, b0)
+        if propio is not None and tams[b0] in (None, propio):
+            return directo
+    for b in range(b0):
+        tam, _ = ubicar_bloque(leer, off, b, meta, tams[b])
+        if tam is None:
+            return None
+        off += tam
+    return off
+
+def rango_comprimido(leer, meta, tams, offset, largo):
+    """
+    Bytes [offset, offset+largo) de un A1 comprimido: ubica y descomprime
+    sólo los bloques que los cubren (los dañados salen en ceros). tams:
+    tamanos_bloques de la tabla, ya leída.
+    """
+    tam_bloque = int(meta["bloque"])
+    fin = min(offset + largo, int(meta["largo_original"]))
+    if fin <= offset:
+        return b""
+    b0 = offset // tam_bloque
+    b1 = (fin - 1) // tam_bloque
+
+    off = ubicar_rango(leer, meta, tams, b0)
+    out = bytearray()
+    for b in range(b0, b1 + 1):
+        tam, sano = ubicar_bloque(leer, off, b, meta, tams[b]) if off is not None else (None, False)
+        out += descomprimir_ubicado(leer, off, tam, sano, meta, b)
+        off = off + tam if tam else None
+    recorte = offset - b0 * tam_bloque
+    return bytes(out[recorte:recorte + fin - offset])
+
+# =====================================================================
+# Cache de resultados (direccionada por contenido)
+# =====================================================================
+
+VERSION_DECODIFICADOR = "A3-3"
+CARPETA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_rs")
+
+class CacheDecodificacion:
+    """
+    Cache en disco de decodificaciones. La clave es el sha256 del archivo
+    de entrada junto con los parámetros del código y la versión del
+    decodificador; guarda el A1 reconstruido y un .json con estadísticas
+    (correcciones por palabra, irrecuperables). Al pasar tam_max se
+    expulsan las entradas usadas hace más tiempo (LRU por mtime).
+    Los aciertos/fallos se acumulan en contadores.json, que se actualiza
+    bajo un archivo de lock: la comparten varios procesos (demonio).
+    """
+    def __init__(self, carpeta=CARPETA_CACHE, tam_max=256*1024*1024):
+        self.carpeta = carpeta
+        self.tam_max = tam_max
+        self.aciertos = 0
+        self.fallos = 0
+        self.pendientes = {"aciertos": 0, "fallos": 0}   # aún no sumados al archivo
+        os.makedirs(carpeta, exist_ok=True)
+
+    def clave(self, path, n=15, k=9):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for trozo in iter(lambda: f.read(1 << 20), b""):
+                h.update(trozo)
+        h.update(f"|RS({n},{k})|{VERSION_DECODIFICADOR}".encode())
+        return h.hexdigest()
+
+    def _ruta(self, clave, ext):
+        return os.path.join(self.carpeta, clave + ext)
+
+    def obtener(self, clave):
+        """Devuelve (data, info) o None."""
+        try:
+            with open(self._ruta(clave, ".json")) as f:
+                info = json.load(f)
+            with open(self._ruta(clave, ".a1"), "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            self._contar(acierto=False)
+            return None
+        # LRU: la entrada pasa a ser la más reciente
+        os.utime(self._ruta(clave, ".a1"))
+        self._contar(acierto=True)
+        return data, info
+
+    def guardar(self, clave, data, info):
+        self._escribir_atomico(self._ruta(clave, ".a1"), data)
+        self._escribir_atomico(self._ruta(clave, ".json"), json.dumps(info).encode())
+        self.expulsar()
+
+    def expulsar(self):
+        entradas = []
+        total = 0
+        for nombre in os.listdir(self.carpeta):
+            if not nombre.endswith(".a1"):
+                continue
+            a1 = os.path.join(self.carpeta, nombre)
+            js = a1[:-3] + ".json"
+            try:
+                tam = os.path.getsize(a1) + (os.path.getsize(js) if os.path.exists(js) else 0)
+                entradas.append((os.path.getmtime(a1), tam, a1, js))
+            except OSError:
+                continue
+            total += tam
+        for _, tam, a1, js in sorted(entradas):
+            if total <= self.tam_max:
+                break
+            for ruta in (a1, js):
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+            total -= tam
+
+    def _escribir_atomico(self, ruta, contenido):
+        tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(contenido)
+        os.replace(tmp, ruta)
+
+    def _contar(self, acierto):
+        if acierto:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+        self.pendientes["aciertos" if acierto else "fallos"] += 1
+        self._volcar_contadores()
+
+    def _volcar_contadores(self, espera_max=2.0):
+        """
+        Suma los pendientes a contadores.json con el lock tomado (creación
+        exclusiva de contadores.json.lock: anda entre procesos y en
+        cualquier SO). Si no se consigue a tiempo quedan para la próxima.
+        """
+        ruta = os.path.join(self.carpeta, "contadores.json")
+        lock = ruta + ".lock"
+        limite = time.monotonic() + espera_max
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock) > 30:   # abandonado
+                        os.remove(lock)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > limite:
+                    return
+                time.sleep(0.005)
+        try:
+            try:
+                with open(ruta) as f:
+                    cont = json.load(f)
+            except (OSError, ValueError):
+                cont = {"aciertos": 0, "fallos": 0}
+            for clave, valor in self.pendientes.items():
+                cont[clave] += valor
+                self.pendientes[clave] = 0
+            self._escribir_atomico(ruta, json.dumps(cont).encode())
+        finally:
+            os.close(fd)
+            os.remove(lock)
+
+    def contadores(self):
+        """Aciertos/fallos acumulados de todas las ejecuciones."""
+        try:
+            with open(os.path.join(self.carpeta, "contadores.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"aciertos": 0, "fallos": 0}
+
+# =====================================================================
+# Acceso aleatorio a un rango de A1
+# =====================================================================
+
+# Líneas más largas que esto se tratan como cuerpo en una sola línea
+MAX_ANCHO_LINEA = 1 << 16
+
+class FormatoArchivo:
+    """
+    Dónde está cada símbolo dentro del archivo, para leer con seek sin
+    cargar todo. Soporta cuerpo en 1 línea o en líneas de ancho fijo.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.inicio = 0
+            while f.peek(1)[:1] == b"#":
+                self.inicio += len(f.readline())
+            linea = f.readline(MAX_ANCHO_LINEA)
+
+            primera = linea.rstrip(b"\r\n")
+            if b" " in primera or b"\t" in primera:
+                raise ValueError("Formato no soportado para acceso aleatorio.")
+
+            cuerpo = os.fstat(f.fileno()).st_size - self.inicio
+            if not linea.endswith(b"\n"):
+                # una sola línea larga: no se lee entera, sólo el final
+                f.seek(-min(cuerpo, 16), os.SEEK_END)
+                cola = f.read()
+                self.ancho = 0
+                self.paso = 0
+                self.total = cuerpo - (len(cola) - len(cola.rstrip()))
+            elif f.read(len(linea)).strip() == b"":
+                # todo en una sola línea
+                self.ancho = 0
+                self.paso = 0
+                self.total = len(primera)
+            else:
+                self.ancho = len(primera)
+                self.paso = len(linea)
+                # la última línea puede ser más corta (última palabra acortada)
+                f.seek(self.inicio + (cuerpo // self.paso) * self.paso)
+                self.total = (cuerpo // self.paso) * self.ancho + len(f.read().rstrip())
+
+    def posicion(self, s):
+        if self.ancho == 0:
+            return self.inicio + s
+        return self.inicio + (s // self.ancho) * self.paso + s % self.ancho
+
+    def leer_simbolos(self, f, s0, s1):
+        """Símbolos [s0, s1) como bytes con valores 0..15."""
+        if s1 <= s0:
+            return b""
+        f.seek(self.posicion(s0))
+        syms = hex_a_simbolos(f.read(self.posicion(s1 - 1) + 1 - self.posicion(s0)))
+        if len(syms) != s1 - s0:
+            raise ValueError("Formato no soportado para acceso aleatorio.")
+        return syms
+
+def palabras_que_cubren(ini, fin, k=9):
+    """Índices [w0, w1] de las palabras con los nibbles de los bytes [ini, fin)."""
+    return (2 * ini) // k, (2 * fin - 1) // k
+
+def leer_palabras_rango(f, fmt, geo, w0, w1):
+    """
+    Junta las palabras w0..w1 de un A3 leyendo, en cada una de las n
+    columnas, sólo el tramo que les corresponde (símbolo j de la palabra
+    i en j·M + i, menos lo que le falta a la última palabra acortada).
+    """
+    n = geo.n
+    buf = bytearray((w1 - w0 + 1) * n)
+    for j in range(n):
+        ini = geo.inicio_columna(j)
+        hasta = min(w1 + 1, geo.largo_columna(j))
+        col = fmt.leer_simbolos(f, ini + w0, ini + hasta)
+        buf[j:j + len(col)*n:n] = col
+    return PalabrasRS(buf, n)
+
+def decodificar_rango_A3(A3_path, offset, largo):
+    """
+    Decodifica sólo los bytes [offset, offset+largo) de A1 a partir de A3,
+    leyendo con seek las columnas de las palabras que los cubren (y antes
+    la tabla de tamaños de bloque si A1 viene comprimido).
+    Devuelve (data, palabras_irrecuperables).
+    """
+    rs = ReedSolomonEuclides(15, 9, memo_activo())
+    meta = leer_cabecera(A3_path)
+    fmt = FormatoArchivo(A3_path)
+    geo = Geometria(meta, fmt.total, rs.n, rs.k)
+    palabras_irrecuperables = []
+
+    with open(A3_path, "rb") as f:
+
+        def bytes_codificados(ini, fin):
+            """Bytes codificados [ini, fin) y offsets (relativos) de las palabras perdidas."""
+            w0, w1 = palabras_que_cubren(ini, fin, rs.k)
+            palabras = leer_palabras_rango(f, fmt, geo, w0, w1)
+
+            infos = bytearray(len(palabras) * rs.k)
+            perdidos = []
+            for i, w in enumerate(palabras):
+                try:
+                    w_corr, info, pos, errores = rs.decodificar_palabra(w, validas=geo.validas(w0 + i))
+                    infos[i*rs.k:(i+1)*rs.k] = info
+                except ValueError:
+                    palabras_irrecuperables.append(w0 + i)
+                    perdidos.append((w0 + i) * rs.k // 2 - ini)
+
+            nib0 = 2 * ini - rs.k * w0
+            return reconstruir_bytes(infos[nib0:nib0 + 2 * (fin - ini)]), perdidos
+
+        if meta.get("comprimido") != "huffman":
+            fin = min(offset + largo, geo.total_bytes())
+            data = bytes_codificados(offset, fin)[0] if fin > offset else b""
+            return data, palabras_irrecuperables
+
+        def leer(ini, fin):
+            fin = min(fin, geo.total_bytes())
+            if fin <= ini:
+                return b""
+            data, perdidos = bytes_codificados(ini, fin)
+            return None if perdidos else data
+
+        _, largo_tabla = tabla_bloques(meta)
+        tabla, perdidos = bytes_codificados(0, largo_tabla) if largo_tabla else (b"", [])
+        tams = tamanos_bloques(meta, lector_bytes(tabla, perdidos))
+        data = rango_comprimido(leer, meta, tams, offset, largo)
+
+    return data, sorted(set(palabras_irrecuperables))
+
 # =====================================================================
 # MAIN DECODIFICACIÓN A3
 # =====================================================================
 
-def decodificar_A3(A3_path, A1_out, insertar_errores=False, longitud_rafaga=0, pos_rafaga=0):
+def decodificar_A3(A3_path, A1_out, insertar_errores=False, longitud_rafaga=0, pos_rafaga=0,
+                   usar_cache=True):
     """
     Decodifica A3 (entrelazado ORIGINAL) y reconstruye A1.
-    Opcionalmente inserta ráfaga de errores para testear.
+    Opcionalmente inserta ráfaga de errores para testear (sin cache).
     """
     print("\n" + "="*70)
     print("DECODIFICADOR A3 (ENTRELAZADO ORIGINAL - COLUMNA POR COLUMNA)")
     print("="*70)
     
-    # Leer A3
-    print(f"\n[1] Leyendo A3: {os.path.basename(A3_path)}")
-    simbolos_A3 = leer_A3(A3_path)
-    num_palabras = len(simbolos_A3) // 15
-    print(f"    Total símbolos: {len(simbolos_A3)}")
-    print(f"    Palabras RS: {num_palabras}")
+    cache = CacheDecodificacion() if usar_cache and not insertar_errores else None
+    resultado = None
+    if cache is not None:
+        clave = cache.clave(A3_path, 15, 9)
+        resultado = cache.obtener(clave)
+
+    if resultado is not None:
+        data, info = resultado
+        print(f"\n[cache] Acierto ({clave[:12]}): se reutiliza la decodificación previa")
+        num_palabras = info["palabras"]
+        palabras_con_errores = info["con_errores"]
+        total_errores_corregidos = info["corregidos"]
+        palabras_irrecuperables = info["irrecuperables"]
+    else:
+        # Leer A3
+        print(f"\n[1] Leyendo A3: {os.path.basename(A3_path)}")
+        simbolos_A3 = leer_A3(A3_path)
+        meta = leer_cabecera(A3_path)
+        geo = Geometria(meta, len(simbolos_A3), 15, 9)
+        num_palabras = geo.palabras
+        print(f"    Total símbolos: {len(simbolos_A3)}")
+        print(f"    Palabras RS: {num_palabras}")
     
-    # Insertar ráfaga si se solicita
-    if insertar_errores:
-        print(f"\n[2] Insertando ráfaga de {longitud_rafaga} errores en pos {pos_rafaga}...")
-        simbolos_A3, cambios = insertar_rafaga(simbolos_A3, pos_rafaga, longitud_rafaga)
-        print(f"    ✓ {len(cambios)} errores insertados")
-        if cambios:
-            print(f"    Ejemplo: pos {cambios[0][0]}: {cambios[0][1]:X} → {cambios[0][2]:X} (e=α^{cambios[0][4]})")
+        # Insertar ráfaga si se solicita
+        if insertar_errores:
+            print(f"\n[2] Insertando ráfaga de {longitud_rafaga} errores en pos {pos_rafaga}...")
+            simbolos_A3, cambios = insertar_rafaga(simbolos_A3, pos_rafaga, longitud_rafaga)
+            print(f"    ✓ {len(cambios)} errores insertados")
+            if cambios:
+                print(f"    Ejemplo: pos {cambios[0][0]}: {cambios[0][1]:X} → {cambios[0][2]:X} (e=α^{cambios[0][4]})")
     
-    # Desentrelazar (VERSIÓN ORIGINAL)
-    print(f"\n[3] Desentrelazando códigos (método ORIGINAL)...")
-    palabras = desentrelazar_codigos_original(simbolos_A3, num_palabras, n=15)
-    print(f"    ✓ {len(palabras)} palabras reconstruidas")
+        # Desentrelazar (VERSIÓN ORIGINAL)
+        print(f"\n[3] Desentrelazando códigos (método ORIGINAL)...")
+        palabras = desentrelazar_codigos_original(simbolos_A3, num_palabras, n=15, geo=geo)
+        print(f"    ✓ {len(palabras)} palabras reconstruidas")
+
+        # Digests: los bloques que coinciden se copian sin decodificar
+        limpios, n_bloque = bloques_limpios(palabras, meta)
+        if "digests" in meta:
+            total_bloques = len(meta["digests"].split(","))
+            print(f"    Digests: {len(limpios)}/{total_bloques} bloques de {n_bloque} palabras intactos")
     
-    # Decodificar
-    print(f"\n[4] Decodificando palabras RS...")
-    rs = ReedSolomonEuclides(15, 9)
+        # Decodificar
+        print(f"\n[4] Decodificando palabras RS...")
+        rs = ReedSolomonEuclides(15, 9, memo_activo())
     
-    infos = []
-    total_errores_corregidos = 0
-    palabras_con_errores = 0
-    palabras_irrecuperables = []
+        # Nibbles de info de todas las palabras (las irrecuperables quedan en 0)
+        infos = bytearray(num_palabras * rs.k)
+        total_errores_corregidos = 0
+        palabras_con_errores = 0
+        palabras_irrecuperables = []
+        correcciones = {}
     
-    for idx, w in enumerate(palabras):
-        try:
-            w_corr, info, pos, errores = rs.decodificar_palabra(w, verbose=False)
+        if lotes_np is not None:
+            # Todas las palabras juntas (síndromes, Berlekamp–Massey, Chien y
+            # Forney vectorizados), salvo las de bloques con digest OK.
+            limpias = bytes(idx // n_bloque in limpios for idx in range(num_palabras))
+            W, nerr = lotes_np.decodificar(palabras.buf, geo.validas(num_palabras - 1), limpias)
+            con_errores = np.flatnonzero(nerr > 0)
+            palabras_con_errores = len(con_errores)
+            total_errores_corregidos = int(nerr[con_errores].sum())
+            correcciones = {int(idx): int(nerr[idx]) for idx in con_errores}
+            for idx in con_errores[con_errores < 5]:  # Mostrar primeras 5 palabras con errores
+                pos = np.flatnonzero(W[idx] != np.frombuffer(palabras[idx], dtype=np.uint8)).tolist()
+                print(f"    W{idx:02d}: {nerr[idx]} error(es) en pos {pos}")
+
+            palabras_irrecuperables = np.flatnonzero(nerr < 0).tolist()
+            for idx in palabras_irrecuperables:
+                print(f"    W{idx:02d}: ✗ IRRECUPERABLE")
+            W[palabras_irrecuperables] = 0      # sus nibbles quedan en 0
+            infos = bytearray(W[:, rs.n-rs.k:].tobytes())
+        else:
+            for idx, w in enumerate(palabras):
+                if idx // n_bloque in limpios:
+                    infos[idx*rs.k:(idx+1)*rs.k] = w[rs.n-rs.k:]
+                    continue
+
+                try:
+                    w_corr, info, pos, errores = rs.decodificar_palabra(w, verbose=False,
+                                                                        validas=geo.validas(idx))
             
-            if errores:
-                palabras_con_errores += 1
-                total_errores_corregidos += len(errores)
-                if idx < 5:  # Mostrar primeras 5 palabras con errores
-                    print(f"    W{idx:02d}: {len(errores)} error(es) en pos {pos}")
+                    if errores:
+                        palabras_con_errores += 1
+                        total_errores_corregidos += len(errores)
+                        correcciones[idx] = len(errores)
+                        if idx < 5:  # Mostrar primeras 5 palabras con errores
+                            print(f"    W{idx:02d}: {len(errores)} error(es) en pos {pos}")
             
-            infos.append(info)
+                    infos[idx*rs.k:(idx+1)*rs.k] = info
 
-        except ValueError as e:
-            print(f"    W{idx:02d}: ✗ IRRECUPERABLE")
-            palabras_irrecuperables.append(idx)
-            infos.append([0]*9)  # Padding para no romper estructura
+                except ValueError as e:
+                    print(f"    W{idx:02d}: ✗ IRRECUPERABLE")
+                    palabras_irrecuperables.append(idx)  # sus nibbles quedan en 0
     
     # Estadísticas
     print(f"\n[5] Estadísticas de decodificación:")
@@ -346,6 +1510,8 @@ def decodificar_A3(A3_path, A1_out, insertar_errores=False, longitud_rafaga=0, p
     print(f"    Palabras con errores (corregidas): {palabras_con_errores} ✓")
     print(f"    Palabras irrecuperables: {len(palabras_irrecuperables)} ✗")
     print(f"    Total errores corregidos: {total_errores_corregidos}")
+    if resultado is None:
+        print(f"    {memo_palabras.resumen()}")
     
     if palabras_irrecuperables:
         print(f"    Palabras perdidas: {palabras_irrecuperables[:20]}")
@@ -353,8 +1519,25 @@ def decodificar_A3(A3_path, A1_out, insertar_errores=False, longitud_rafaga=0, p
             print(f"                       ... y {len(palabras_irrecuperables)-20} más")
     
     # Reconstruir A1
-    print(f"\n[6] Reconstruyendo A1...")
-    data = reconstruir_bytes(infos)
+    if resultado is None:
+        print(f"\n[6] Reconstruyendo A1...")
+        # con '#largo' se descartan los nibbles de relleno de la última palabra
+        data = reconstruir_bytes(infos[:2 * geo.total_bytes()])
+
+        if meta.get("comprimido") == "huffman":
+            print(f"    Descomprimiendo {tabla_bloques(meta)[0]} bloques Huffman...")
+            data = descomprimir_bloques(data, meta, palabras_irrecuperables)
+
+        if cache is not None:
+            cache.guardar(clave, data, {
+                "palabras": num_palabras,
+                "con_errores": palabras_con_errores,
+                "corregidos": total_errores_corregidos,
+                "correcciones": correcciones,
+                "irrecuperables": palabras_irrecuperables,
+            })
+    else:
+        print(f"\n[6] A1 tomado de la cache")
     
     with open(A1_out, "wb") as f:
         f.write(data)
@@ -373,10 +1556,385 @@ def decodificar_A3(A3_path, A1_out, insertar_errores=False, longitud_rafaga=0, p
         print(f"\n[7] Contenido binario (hex completo):")
         print(f"    {data.hex()}")
     
+    if cache is not None:
+        cont = cache.contadores()
+        print(f"[cache] Aciertos: {cont['aciertos']}  Fallos: {cont['fallos']}")
+
     print("\n" + "="*70)
     
     return data, palabras_irrecuperables
 
+# =====================================================================
+# MODO POR VENTANAS (fuera de memoria): mmap + W palabras por vez
+# =====================================================================
+
+# Bytes por palabra de una ventana en vuelo: símbolos (n), nibbles de info
+# (k), las tres copias de reconstruir_bytes (bytes, hex, str) y la salida;
+# con NumPy además la copia corregida (n) y los contadores y la máscara.
+# Medido con tracemalloc: ~50 bytes por palabra sin NumPy, ~45 con NumPy.
+BYTES_POR_PALABRA = 15 + 9 + 3*9 + 5 + (15 + 2 if np is not None else 0)
+# Temporales de DecodificadorLotes por palabra del lote (índices int64 de
+# Berlekamp–Massey, evaluaciones (N, n) de Chien/Forney, claves y
+# resultados para el memo). Medido: ~435.
+BYTES_POR_PALABRA_LOTE = 450 if np is not None else 0
+
+def reservar_memo(memoria_max, memos=1):
+    """
+    Con memoria acotada el memo de palabras entra en la cuenta: entre los
+    `memos` (uno por proceso) usan a lo sumo 1/8 de memoria_max. Devuelve
+    lo que queda para las ventanas.
+    """
+    memo_palabras.limitar(memoria_max // 8 // (memos * BYTES_POR_ENTRADA_MEMO))
+    return memoria_max - memos * memo_palabras.tam_max * BYTES_POR_ENTRADA_MEMO
+
+def ventana_para_memoria(memoria_max, ventanas_en_vuelo=1, lotes_en_vuelo=1):
+    """
+    Palabras por ventana para que las ventanas en vuelo y los lotes que se
+    decodifican a la vez (uno por trabajador) no pasen de memoria_max.
+    """
+    por_ventana = BYTES_POR_PALABRA * ventanas_en_vuelo
+    lote = LOTE_PALABRAS * BYTES_POR_PALABRA_LOTE * lotes_en_vuelo
+    ventana = (memoria_max - lote) // por_ventana
+    if ventana < LOTE_PALABRAS:
+        # ventanas más chicas que un lote: el lote es la ventana entera
+        ventana = memoria_max // (por_ventana + BYTES_POR_PALABRA_LOTE * lotes_en_vuelo)
+    return max(2, ventana - ventana % 2)   # par: cada ventana cierra en byte entero
+
+def ventanas_A3(A3_path, fmt, geo, ventana):
+    """
+    Recorre el A3 mapeado en memoria (mmap) de a `ventana` palabras: para
+    cada ventana lee de las n columnas sólo el tramo que le corresponde.
+    Nunca hay más de una ventana leída a la vez.
+    """
+    if geo.palabras == 0:
+        return
+    with open(A3_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for w0 in range(0, geo.palabras, ventana):
+            w1 = min(w0 + ventana, geo.palabras) - 1
+            yield w0, leer_palabras_rango(mm, fmt, geo, w0, w1)
+            # soltar las páginas ya leídas para que no se acumulen en la RSS
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_DONTNEED)
+
+def decodificar_A3_por_ventanas(A3_path, A1_out, memoria_max=64*1024*1024, ventana=None):
+    """
+    Decodifica un A3 entrelazado de archivo completo (símbolo j de la
+    palabra i en j·M + i) sin cargarlo entero: mmap del archivo, una
+    ventana de W palabras por vez, y la salida se va agregando a A1_out.
+    La memoria queda acotada por memoria_max sin importar el tamaño del A3.
+    Devuelve (palabras_irrecuperables, estadisticas).
+    """
+    n, k = 15, 9
+    meta = leer_cabecera(A3_path)
+    fmt = FormatoArchivo(A3_path)
+    geo = Geometria(meta, fmt.total, n, k)
+    digests = leer_digests(meta)
+    if ventana is None:
+        ventana = ventana_para_memoria(reservar_memo(memoria_max))
+    ventana = alinear_ventana(ventana, digests)
+
+    estadisticas = {"ventana": ventana, "con_errores": 0, "corregidos": 0}
+    palabras_irrecuperables = []
+
+    t0 = time.perf_counter()
+    with open(A1_out, "wb") as f:
+        salida = SalidaA1(f, meta, k, geo.largo)
+        for w0, palabras in ventanas_A3(A3_path, fmt, geo, ventana):
+            dig = digests_ventana(digests, w0, w0 + len(palabras) - 1, geo.palabras)
+            infos, con_errores, corregidos, irrec = decodificar_ventana(palabras.buf, w0, geo, dig)
+            estadisticas["con_errores"] += con_errores
+            estadisticas["corregidos"] += corregidos
+            palabras_irrecuperables.extend(irrec)
+            salida.escribir(reconstruir_bytes(infos), irrec)
+        salida.terminar()
+        estadisticas["bytes_escritos"] = salida.escritos
+    estadisticas["tiempo"] = time.perf_counter() - t0
+
+    return palabras_irrecuperables, estadisticas
+
+# =====================================================================
+# MODO PIPELINE: lector -> decodificador -> escritor (hilos)
+# =====================================================================
+
+class ColaMedida:
+    """
+    Cola acotada que cuenta las esperas ("stalls") de quien pone (cola
+    llena) y de quien saca (cola vacía), con el tiempo perdido en cada una.
+    """
+    def __init__(self, maxsize):
+        self.q = queue.Queue(maxsize)
+        self.esperas_put = 0
+        self.tiempo_put = 0.0
+        self.esperas_get = 0
+        self.tiempo_get = 0.0
+
+    def put(self, x):
+        try:
+            self.q.put_nowait(x)
+        except queue.Full:
+            self.esperas_put += 1
+            t0 = time.perf_counter()
+            self.q.put(x)
+            self.tiempo_put += time.perf_counter() - t0
+
+    def get(self):
+        try:
+            return self.q.get_nowait()
+        except queue.Empty:
+            self.esperas_get += 1
+            t0 = time.perf_counter()
+            x = self.q.get()
+            self.tiempo_get += time.perf_counter() - t0
+            return x
+
+class SalidaA1:
+    """
+    Escribe A1 a medida que llegan los bytes decodificados de cada ventana.
+    Si A1 viene comprimido, lee primero la tabla de tamaños y después
+    ubica (ubicar_bloque) y descomprime cada bloque Huffman apenas tiene
+    sus bytes y la cabecera del siguiente; los que tocan una palabra
+    perdida se escriben en ceros. terminar() resuelve lo que queda al
+    final del flujo.
+    """
+    def __init__(self, f, meta, k=9, largo=None):
+        self.f = f
+        self.k = k
+        self.largo = largo          # bytes codificados reales (sin relleno)
+        self.recibidos = 0
+        self.escritos = 0
+        self.comprimido = meta.get("comprimido") == "huffman"
+        if self.comprimido:
+            self.meta = meta
+            self.cantidad, self.off = tabla_bloques(meta)   # off: donde empieza el bloque b
+            self.tams = None if self.off else tamanos_bloques(meta, self.leer)
+            self.alcance = max_bloque(meta) + CABECERA_BLOQUE
+            self.b = 0
+            self.inicio = 0              # offset codificado de pendiente[0]
+            self.pendiente = bytearray()
+            self.bytes_perdidos = []     # en orden: las ventanas llegan en orden
+
+    def leer(self, ini, fin):
+        i = bisect_left(self.bytes_perdidos, ini - 4)
+        if i < len(self.bytes_perdidos) and self.bytes_perdidos[i] < fin:
+            return None
+        return self.pendiente[ini - self.inicio:fin - self.inicio]
+
+    def escribir(self, data, palabras_perdidas=()):
+        if self.largo is not None:
+            data = data[:max(0, self.largo - self.recibidos)]
+        self.recibidos += len(data)
+
+        if not self.comprimido:
+            self.f.write(data)
+            self.escritos += len(data)
+            return
+
+        self.bytes_perdidos.extend(idx * self.k // 2 for idx in palabras_perdidas)
+        self.pendiente += data
+        self.descomprimir(final=False)
+
+    def descomprimir(self, final):
+        disponible = self.inicio + len(self.pendiente)
+        if self.tams is None:
+            if disponible < self.off and not final:
+                return
+            self.tams = tamanos_bloques(self.meta, self.leer)
+
+        while self.b < self.cantidad:
+            tam, sano = None, False
+            if self.off is not None:
+                if "bloques" in self.meta:
+                    necesario = self.off + self.tams[self.b]
+                else:
+                    # el bloque más largo posible y la cabecera del siguiente
+                    necesario = self.off + self.alcance
+                    if self.largo is not None:
+                        necesario = min(necesario, self.largo)
+                if disponible < necesario and not final:
+                    return
+                tam, sano = ubicar_bloque(self.leer, self.off, self.b, self.meta, self.tams[self.b])
+            out = descomprimir_ubicado(self.leer, self.off, tam, sano, self.meta, self.b)
+            self.f.write(out)
+            self.escritos += len(out)
+            self.off = self.off + tam if tam else None
+            self.b += 1
+
+            if self.off is not None and self.off > self.inicio:
+                del self.pendiente[:self.off - self.inicio]
+                self.inicio = self.off
+                self.bytes_perdidos = [p for p in self.bytes_perdidos if p >= self.inicio - 4]
+
+    def terminar(self):
+        if self.comprimido:
+            self.descomprimir(final=True)
+
+def decodificar_ventana(buf, w0, geo, digests=None):
+    """
+    Decodifica una ventana de palabras (buf: símbolos en orden de palabra).
+    Está a nivel de módulo para poder mandarla a procesos trabajadores.
+    Con NumPy la ventana entera se resuelve por lotes (DecodificadorLotes).
+    digests: los de los bloques enteros de la ventana (digests_ventana);
+    esas palabras se copian sin decodificar si el CRC coincide.
+    Devuelve (nibbles de info, palabras con errores, errores corregidos,
+    irrecuperables).
+    """
+    n, k = geo.n, geo.k
+    palabras = PalabrasRS(buf, n)
+    limpias = palabras_limpias(palabras, w0, digests)
+    if lotes_np is not None and len(buf):
+        W, nerr = lotes_np.decodificar(buf, geo.validas(w0 + len(buf) // n - 1), limpias)
+        infos = W[:, n-k:]
+        infos[nerr < 0] = 0
+        corregidas = nerr[nerr > 0]
+        return (infos.tobytes(), len(corregidas), int(corregidas.sum()),
+                (np.flatnonzero(nerr < 0) + w0).tolist())
+
+    rs = ReedSolomonEuclides(n, k, memo_activo())
+    infos = bytearray(len(palabras) * k)
+    con_errores = 0
+    corregidos = 0
+    irrecuperables = []
+    for i, w in enumerate(palabras):
+        if limpias[i]:
+            infos[i*k:(i+1)*k] = w[n-k:]
+            continue
+        try:
+            w_corr, info, pos, errores = rs.decodificar_palabra(w, validas=geo.validas(w0 + i))
+        except ValueError:
+            irrecuperables.append(w0 + i)
+            continue
+        if errores:
+            con_errores += 1
+            corregidos += len(errores)
+        infos[i*k:(i+1)*k] = info
+    return infos, con_errores, corregidos, irrecuperables
+
+def decodificar_A3_pipeline(A3_path, A1_out, ventana=4096, profundidad=4,
+                            trabajadores=0, usar_procesos=False, memoria_max=None):
+    """
+    Decodifica A3 con tres etapas en paralelo unidas por colas acotadas:
+    un hilo lector que junta ventanas de palabras (seek por columna), la
+    etapa de decodificación (en línea, o repartida en trabajadores hilo o
+    proceso) y un hilo escritor. Así la lectura y escritura a disco se
+    solapan con la decodificación de otras ventanas.
+
+    memoria_max (bytes), si se da, fija el tamaño de ventana (y acota el
+    memo de palabras) para que lo que está en vuelo no lo supere.
+    Devuelve (palabras_irrecuperables, estadisticas).
+    """
+    n, k = 15, 9
+    meta = leer_cabecera(A3_path)
+    fmt = FormatoArchivo(A3_path)
+    geo = Geometria(meta, fmt.total, n, k)
+
+    if memoria_max:
+        # en vuelo: las dos colas llenas + trabajadores + lector y escritor
+        memos = trabajadores if usar_procesos and trabajadores else 1
+        ventana = ventana_para_memoria(reservar_memo(memoria_max, memos),
+                                       2 * profundidad + trabajadores + 2, max(1, trabajadores))
+    digests = leer_digests(meta)
+    ventana = alinear_ventana(ventana, digests)
+
+    cola_lectura = ColaMedida(profundidad)
+    cola_escritura = ColaMedida(profundidad)
+    fallas = []
+    FIN = None
+
+    def lector():
+        try:
+            for w0, palabras in ventanas_A3(A3_path, fmt, geo, ventana):
+                dig = digests_ventana(digests, w0, w0 + len(palabras) - 1, geo.palabras)
+                cola_lectura.put((w0, palabras.buf, dig))
+        except Exception as e:
+            fallas.append(e)
+        finally:
+            cola_lectura.put(FIN)
+
+    def decodificador(pool):
+        try:
+            while True:
+                item = cola_lectura.get()
+                if item is FIN:
+                    break
+                w0, buf, dig = item
+                if pool is None:
+                    cola_escritura.put((w0, decodificar_ventana(buf, w0, geo, dig)))
+                else:
+                    cola_escritura.put((w0, pool.submit(decodificar_ventana, buf, w0, geo, dig)))
+        except Exception as e:
+            fallas.append(e)
+            while cola_lectura.get() is not FIN:
+                pass
+        finally:
+            cola_escritura.put(FIN)
+
+    estadisticas = {"ventana": ventana, "con_errores": 0, "corregidos": 0}
+    palabras_irrecuperables = []
+
+    def escritor():
+        try:
+            with open(A1_out, "wb") as f:
+                salida = SalidaA1(f, meta, k, geo.largo)
+                while True:
+                    item = cola_escritura.get()
+                    if item is FIN:
+                        break
+                    w0, res = item
+                    if not isinstance(res, tuple):
+                        res = res.result()
+                    infos, con_errores, corregidos, irrec = res
+                    estadisticas["con_errores"] += con_errores
+                    estadisticas["corregidos"] += corregidos
+                    palabras_irrecuperables.extend(irrec)
+                    salida.escribir(reconstruir_bytes(infos), irrec)
+                salida.terminar()
+                estadisticas["bytes_escritos"] = salida.escritos
+        except Exception as e:
+            fallas.append(e)
+            while cola_escritura.get() is not FIN:
+                pass
+
+    pool = None
+    if trabajadores:
+        Executor = ProcessPoolExecutor if usar_procesos else ThreadPoolExecutor
+        pool = Executor(max_workers=trabajadores)
+
+    t0 = time.perf_counter()
+    hilos = [threading.Thread(target=lector, name="lector"),
+             threading.Thread(target=decodificador, args=(pool,), name="decodificador"),
+             threading.Thread(target=escritor, name="escritor")]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    if pool is not None:
+        pool.shutdown()
+
+    if fallas:
+        raise fallas[0]
+
+    estadisticas["tiempo"] = time.perf_counter() - t0
+    estadisticas["stalls"] = {
+        "lector (cola llena)":         (cola_lectura.esperas_put, cola_lectura.tiempo_put),
+        "decodificador (sin entrada)": (cola_lectura.esperas_get, cola_lectura.tiempo_get),
+        "decodificador (cola llena)":  (cola_escritura.esperas_put, cola_escritura.tiempo_put),
+        "escritor (sin entrada)":      (cola_escritura.esperas_get, cola_escritura.tiempo_get),
+    }
+    return palabras_irrecuperables, estadisticas
+
+def mostrar_estadisticas_ventanas(irrec, est):
+    print(f"\n    Ventana: {est['ventana']} palabras")
+    print(f"    Palabras con errores (corregidas): {est['con_errores']} ✓")
+    print(f"    Palabras irrecuperables: {len(irrec)} ✗")
+    print(f"    Total errores corregidos: {est['corregidos']}")
+    print(f"    Bytes escritos: {est['bytes_escritos']}")
+    print(f"    Tiempo: {est['tiempo']:.2f} s")
+    print(f"    {memo_palabras.resumen()}")
+    if "stalls" in est:
+        print("\n    Stalls por etapa (veces, segundos):")
+        for etapa, (veces, seg) in est["stalls"].items():
+            print(f"      {etapa:30s} {veces:6d}  {seg:8.3f}")
+
 # =====================================================================
 # Interfaz de usuario
 # =====================================================================
@@ -415,6 +1973,13 @@ if __name__ == "__main__":
     print("DECODIFICADOR RS(15,9) PARA A3 (ENTRELAZADO ORIGINAL)")
     print("="*70)
     
+    # --sin-cache: decodificar siempre, sin consultar ni guardar en la cache
+    usar_cache = "--sin-cache" not in sys.argv
+
+    # --memo N: máximo de palabras en el memo de palabras sucias (0 = sin memo)
+    if "--memo" in sys.argv:
+        memo_palabras.tam_max = int(sys.argv[sys.argv.index("--memo") + 1])
+
     # Seleccionar archivo A3
     A3_path = elegir_archivo_txt(carpeta)
     
@@ -430,13 +1995,49 @@ if __name__ == "__main__":
         if not continuar.startswith('s'):
             sys.exit(0)
     
-    # Preguntar si insertar errores
+    # Rango de A1 (acceso aleatorio)
     print("\n" + "-"*70)
+    if input("¿Decodificar sólo un rango de A1? (s/n)> ").lower().startswith('s'):
+        offset = int(input("Offset (byte inicial de A1)> ").strip())
+        largo = int(input("Cantidad de bytes> ").strip())
+        A1_out = os.path.join(carpeta, f"A1_desde_A3_rango_{offset}_{largo}.txt")
+        data, irrec = decodificar_rango_A3(A3_path, offset, largo)
+        with open(A1_out, "wb") as f:
+            f.write(data)
+        print(f"\n{data.decode('ascii', errors='replace')}")
+        print(f"\nSalida guardada en: {A1_out}")
+        if irrec:
+            print(f"⚠️ Palabras irrecuperables: {irrec}")
+        sys.exit(0)
+
+    # Preguntar si insertar errores
     test_errores = input("¿Insertar ráfaga de errores para testear? (s/n)> ").lower().startswith('s')
     
     insertar = False
     longitud = 0
     pos = 0
+
+    if not test_errores and input("¿Modo por ventanas (A3 más grande que la RAM)? (s/n)> ").lower().startswith('s'):
+        op = input("Memoria máxima en MB (ENTER = 64)> ").strip()
+        memoria = (int(op) if op.isdigit() else 64) * 1024 * 1024
+        A1_out = os.path.join(carpeta, "A1_desde_A3.txt")
+        irrec, est = decodificar_A3_por_ventanas(A3_path, A1_out, memoria)
+        mostrar_estadisticas_ventanas(irrec, est)
+        print(f"\n    ✓ Guardado: {os.path.basename(A1_out)}")
+        sys.exit(0)
+
+    if not test_errores and input("¿Modo pipeline (leer/decodificar/escribir en paralelo)? (s/n)> ").lower().startswith('s'):
+        op = input("Trabajadores de decodificación (ENTER = 0, en línea)> ").strip()
+        trabajadores = int(op) if op.isdigit() else 0
+        procesos = trabajadores > 0 and input("¿Usar procesos en vez de hilos? (s/n)> ").lower().startswith('s')
+        op = input("Memoria máxima en MB para ventanas (ENTER = ventana de 4096 palabras)> ").strip()
+        memoria = int(op) * 1024 * 1024 if op.isdigit() else None
+        A1_out = os.path.join(carpeta, "A1_desde_A3.txt")
+        irrec, est = decodificar_A3_pipeline(A3_path, A1_out, trabajadores=trabajadores,
+                                             usar_procesos=procesos, memoria_max=memoria)
+        mostrar_estadisticas_ventanas(irrec, est)
+        print(f"\n    ✓ Guardado: {os.path.basename(A1_out)}")
+        sys.exit(0)
     
     if test_errores:
         simbolos_temp = leer_A3(A3_path)
@@ -460,7 +2061,7 @@ if __name__ == "__main__":
     
     # Decodificar
     try:
-        data, irrec = decodificar_A3(A3_path, A1_out, insertar, longitud, pos)
+        data, irrec = decodificar_A3(A3_path, A1_out, insertar, longitud, pos, usar_cache)
         
         if len(irrec) == 0:
             print("\n✅ ÉXITO: Todas las palabras fueron recuperadas.")